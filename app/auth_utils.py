@@ -1,4 +1,6 @@
-
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
 from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta
@@ -7,18 +9,59 @@ import os
 
 load_dotenv()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost: raising it later is safe, old hashes get upgraded on next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 
+# Dedicated pool for bcrypt so a login spike can't eat the threads/event loop
+# the rest of the API needs. bcrypt releases the GIL, so threads run in parallel.
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Max hash jobs running + waiting; beyond this we answer 503 right away
+HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", str(HASH_WORKERS * 8)))
+
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_jobs = 0  # only touched from the event loop thread, so no lock needed
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
+async def _run_hash_job(fn, *args):
+    """
+    Runs a bcrypt call on the hashing executor.
+    Raises 503 when too many are already queued (better than a 10s login).
+    """
+    global _hash_jobs
+    if _hash_jobs >= HASH_QUEUE_LIMIT:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many login attempts right now, please retry",
+            headers={"Retry-After": "1"},
+        )
+    _hash_jobs += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_jobs -= 1
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hash_job(hash_password, password)
+
+async def verify_and_update_password(plain: str, hashed: str):
+    """
+    Returns (is_valid, new_hash).
+    new_hash is set when the stored hash uses an outdated cost and should be saved.
+    """
+    return await _run_hash_job(pwd_context.verify_and_update, plain, hashed)
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=EXPIRE_MINUTES)
@@ -1,4 +1,23 @@
 # app/bot_knowledge.py
+import re
+from typing import Optional
+
+# Live answers filled in from app/stats.py counters.
+# "requires" = at least one of these words (or its plural) must also appear
+# in the message as a whole word ("cat" doesn't count inside "location").
+STATS = [
+    {
+        "tags": ["available"],
+        "requires": ["pet", "dog", "cat"],
+        "status": "AVAILABLE",
+        "answer": "Right now, there are {count} {noun} available on PawTrack 🐾"
+    },
+    {
+        "tags": ["adopted"],
+        "status": "ADOPTED",
+        "answer": "So far, {count} {noun} have been adopted 🎉"
+    },
+]
 
 FAQ = [
     {
@@ -22,3 +41,57 @@ FAQ = [
         "answer": "Each pet post includes a Google Maps link so you can find the exact place."
     },
 ]
+
+# Priority = position in this list (live stats first, then FAQ top to bottom)
+RULES = STATS + FAQ
+
+
+def _compile(rules):
+    """
+    Builds ONE regex for every tag, compiled once at import.
+    Tags are tried longest-first, so "adopted" is never read as "adopt",
+    and must start at a word boundary ("post" doesn't fire inside "compost").
+    """
+    tag_rule = {}
+    for index, rule in enumerate(rules):
+        for tag in rule["tags"]:
+            tag_rule.setdefault(tag, index)
+    tags = sorted(tag_rule, key=len, reverse=True)
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(tag) for tag in tags) + ")")
+    return pattern, tag_rule
+
+
+def _words(words) -> re.Pattern:
+    # whole words, singular or plural
+    return re.compile(r"\b(?:" + "|".join(re.escape(word) + "s?" for word in words) + r")\b")
+
+
+_MATCHER, _TAG_RULE = _compile(RULES)
+_REQUIRES = {index: _words(rule["requires"]) for index, rule in enumerate(RULES) if rule.get("requires")}
+_SPECIES = re.compile(r"\b(dog|cat)s?\b")
+
+
+def match_species(message: str) -> Optional[str]:
+    """
+    "how many dogs?" -> "DOG"; None if no species is named as a word.
+    """
+    match = _SPECIES.search(message)
+    return match.group(1).upper() if match else None
+
+
+def match_rule(message: str) -> Optional[dict]:
+    """
+    Returns the highest-priority rule whose tag appears in the (lowercased) message.
+    """
+    best = None
+    for match in _MATCHER.finditer(message):
+        index = _TAG_RULE[match.group(0)]
+        if best is not None and index >= best:
+            continue
+        requires = _REQUIRES.get(index)
+        if requires and not requires.search(message):
+            continue
+        best = index
+        if best == 0:
+            break
+    return RULES[best] if best is not None else None
@@ -0,0 +1,257 @@
+# app/bulk.py
+import codecs
+import csv
+import json
+import os
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Deque, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+try:
+    from psycopg import Error as PsycopgError
+except ImportError:  # no psycopg = no COPY path
+    PsycopgError = SQLAlchemyError
+
+from .geo import location_fields
+from .models import Pet
+from .schemas import PetCreate
+
+# Rows per INSERT / COPY (and per commit). Memory use is bounded by this.
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+# Only the first N bad lines are listed in the report, the rest are just counted
+MAX_REPORTED_ERRORS = 1000
+# A longer line is reported as an error and skipped, never buffered whole
+BULK_MAX_LINE_LENGTH = int(os.getenv("BULK_MAX_LINE_LENGTH", str(64 * 1024)))
+# Lines a quoted CSV field may span before its row is rejected as unterminated
+BULK_MAX_RECORD_LINES = int(os.getenv("BULK_MAX_RECORD_LINES", "50"))
+
+# Column order used for COPY
+PET_COLUMNS = [
+    "title", "species", "description", "photo_url", "location_url", "location_text",
+    "latitude", "longitude", "geocell", "status", "created_at",
+]
+
+
+def _decode_line(raw: bytes) -> Union[str, Exception]:
+    try:
+        return raw.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError as e:
+        return ValueError(f"invalid UTF-8 at byte {e.start}")
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Union[str, Exception]]]:
+    """
+    Turns a streamed body into (line_number, text) without holding the whole upload.
+    Lines are decoded one by one, so a line that isn't UTF-8, or is longer than
+    BULK_MAX_LINE_LENGTH bytes, comes out as (line_number, ValueError) and
+    the rest of the upload is unaffected.
+    """
+    too_long = ValueError(f"line longer than {BULK_MAX_LINE_LENGTH} bytes")
+    buffer = b""
+    line_no = 0
+    skipping = False  # inside an over-long line that was already reported
+    bom_checked = False
+    async for chunk in chunks:
+        buffer += chunk
+        if not bom_checked and len(buffer) >= len(codecs.BOM_UTF8):
+            buffer = buffer.removeprefix(codecs.BOM_UTF8)
+            bom_checked = True
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if skipping:
+                skipping = False
+            elif len(line) > BULK_MAX_LINE_LENGTH:
+                yield line_no, too_long
+            else:
+                yield line_no, _decode_line(line)
+        if len(buffer) > BULK_MAX_LINE_LENGTH:
+            if not skipping:
+                skipping = True
+                yield line_no + 1, too_long
+            buffer = b""
+    if not bom_checked:
+        buffer = buffer.removeprefix(codecs.BOM_UTF8)
+    if buffer and not skipping:
+        yield line_no + 1, too_long if len(buffer) > BULK_MAX_LINE_LENGTH else _decode_line(buffer)
+
+
+async def _iter_ndjson(chunks) -> AsyncIterator[Tuple[int, object]]:
+    async for line_no, line in _iter_lines(chunks):
+        if isinstance(line, Exception):
+            yield line_no, line
+            continue
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            yield line_no, ValueError(f"invalid JSON: {e}")
+
+
+class _NeedMoreLines(Exception):
+    pass
+
+
+def _then_need_more(lines: List[str]):
+    # csv.reader only pulls past the last line when a quoted field is still open
+    yield from lines
+    raise _NeedMoreLines
+
+
+async def _iter_csv(chunks) -> AsyncIterator[Tuple[int, object]]:
+    """
+    First row = header. Quoted fields may span up to BULK_MAX_RECORD_LINES lines.
+    Empty cells become None so optional fields stay optional.
+
+    A multi-line record that stays open or comes out with the wrong number of
+    columns (e.g. a stray quote) fails on its first line only; parsing resumes
+    from the line after it, so the rows that follow are not lost.
+    """
+    header: Optional[List[str]] = None
+    record: List[Tuple[int, str]] = []  # lines of the row being assembled
+    pending: Deque[Tuple[int, Union[str, Exception]]] = deque()
+
+    def reject_first(error: str) -> Tuple[int, Exception]:
+        # re-read everything after the record's first line as fresh rows
+        start_line = record[0][0]
+        pending.extendleft(reversed(record[1:]))
+        record.clear()
+        return start_line, ValueError(error)
+
+    def parse(final: bool):
+        nonlocal header
+        while pending or (final and record):
+            if not pending:
+                # end of upload inside a quoted field: fail its first line, re-read the rest
+                yield reject_first("unterminated quoted field")
+                continue
+            line_no, line = pending.popleft()
+            if isinstance(line, Exception):
+                if record:
+                    pending.appendleft((line_no, line))
+                    yield reject_first("unterminated quoted field")
+                else:
+                    yield line_no, line
+                continue
+            if not record and not line.strip():
+                continue
+
+            record.append((line_no, line))
+            try:
+                values = next(csv.reader(_then_need_more([text + "\n" for _, text in record])))
+            except _NeedMoreLines:
+                if len(record) >= BULK_MAX_RECORD_LINES or (final and not pending):
+                    yield reject_first("unterminated quoted field")
+                continue
+            except csv.Error as e:
+                yield reject_first(f"invalid CSV: {e}")
+                continue
+
+            if header is None:
+                header = [name.strip() for name in values]
+                record.clear()
+                continue
+            if len(values) != len(header):
+                yield reject_first(f"expected {len(header)} columns, got {len(values)}")
+                continue
+            start_line = record[0][0]
+            record.clear()
+            yield start_line, {name: (value if value != "" else None) for name, value in zip(header, values)}
+
+    async for item in _iter_lines(chunks):
+        pending.append(item)
+        for result in parse(final=False):
+            yield result
+    for result in parse(final=True):
+        yield result
+
+
+async def _write_batch(db: AsyncSession, rows: List[dict]):
+    """
+    One round trip for the whole batch:
+    COPY on Postgres (psycopg), executemany INSERT everywhere else.
+    """
+    if db.bind.dialect.name == "postgresql":
+        conn = await db.connection()
+        raw = await conn.get_raw_connection()
+        columns = ", ".join(PET_COLUMNS)
+        async with raw.driver_connection.cursor() as cur:
+            async with cur.copy(f"COPY pets ({columns}) FROM STDIN") as copy:
+                for row in rows:
+                    await copy.write_row([row[name] for name in PET_COLUMNS])
+    else:
+        await db.execute(insert(Pet), rows)
+    await db.commit()
+
+
+async def import_pets(
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    db: AsyncSession,
+    on_batch: Optional[Callable[[List[dict]], Awaitable[None]]] = None,
+) -> dict:
+    """
+    Validates every record with PetCreate and inserts the good ones in batches.
+    Returns a report: {inserted, failed, errors: [{line, errors}], errors_truncated}
+    on_batch(rows) is awaited after each committed batch.
+    """
+    records = _iter_csv(chunks) if fmt == "csv" else _iter_ndjson(chunks)
+    report = {"inserted": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+    def fail(line_no: int, errors: List[str]):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"line": line_no, "errors": errors})
+        else:
+            report["errors_truncated"] = True
+
+    async def flush(batch: List[Tuple[int, dict]]):
+        rows = [row for _, row in batch]
+        try:
+            await _write_batch(db, rows)
+        except (SQLAlchemyError, PsycopgError) as e:
+            # COPY goes through the raw psycopg cursor, so its errors aren't wrapped
+            await db.rollback()
+            for line_no, _ in batch:
+                fail(line_no, [f"database error: {e.__class__.__name__}"])
+            return
+        report["inserted"] += len(rows)
+        if on_batch:
+            await on_batch(rows)
+
+    batch: List[Tuple[int, dict]] = []
+    async for line_no, record in records:
+        if isinstance(record, Exception):
+            fail(line_no, [str(record)])
+            continue
+        if not isinstance(record, dict):
+            fail(line_no, ["expected an object"])
+            continue
+        try:
+            pet = PetCreate(**record)
+        except ValidationError as e:
+            fail(line_no, [
+                f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()
+            ])
+            continue
+
+        row = pet.dict()
+        row.update(location_fields(pet.location_url))
+        row["status"] = "AVAILABLE"
+        row["created_at"] = datetime.utcnow()
+        batch.append((line_no, row))
+
+        if len(batch) >= BULK_BATCH_SIZE:
+            await flush(batch)
+            batch = []
+
+    if batch:
+        await flush(batch)
+
+    return report
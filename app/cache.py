@@ -0,0 +1,238 @@
+# app/cache.py
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.requests import HTTPConnection
+
+from .db import READ_PRIMARY_SCOPE_KEY, READ_YOUR_WRITES_SECONDS, pinned_to_primary, replicas
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+
+# Responses bigger than this are served but not stored
+MAX_CACHED_BODY = 1024 * 1024
+
+_PET_DETAIL = re.compile(r"^/pets/\d+$")
+
+# A cached response: (status, headers, body, etag)
+Entry = Tuple[int, List[Tuple[bytes, bytes]], bytes, str]
+
+
+class MemoryCacheBackend:
+    """
+    Default store: bounded LRU with a TTL, local to this worker.
+
+    Version stamps are per worker too. On Postgres, writes made by other
+    workers still bump them: every pet event received over LISTEN calls
+    ResponseCache.bump (see bump_cache_for_event in app/main.py), so a
+    stale entry lives only until that NOTIFY arrives. On other databases
+    only the writing worker is invalidated, so run a single worker there.
+
+    Any object with the same async methods (get / set / get_versions / bump)
+    can be passed to ResponseCache instead, e.g. a Redis-backed one.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, ttl: float = RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, Entry]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[Entry]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: Entry):
+        self._entries[key] = (time.monotonic() + self.ttl, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_versions(self, names: List[str]) -> List[int]:
+        return [self._versions.get(name, 0) for name in names]
+
+    async def bump(self, name: str):
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ResponseCache:
+    """
+    Caches GET /pets and GET /pets/{pet_id}.
+
+    Keys include a version stamp per pet status; create_pet / save_pet bump it,
+    so a write makes the old entries unreachable instead of serving them stale.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryCacheBackend()
+        # when this worker last bumped each stamp (monotonic clock)
+        self._bumped_at: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def dependencies(path: str, query: Dict[str, str]) -> Optional[List[str]]:
+        """
+        Version stamps a response depends on, or None if the path isn't cached.
+        """
+        if path == "/pets":
+            return ["pets:" + (query.get("status") or "AVAILABLE").upper()]
+        if _PET_DETAIL.match(path):
+            return ["pets:*"]
+        return None
+
+    async def bump(self, *statuses: str):
+        """
+        Call after a write that changed pets with these statuses.
+        """
+        now = time.monotonic()
+        for name in {"pets:" + status for status in statuses} | {"pets:*"}:
+            await self.backend.bump(name)
+            self._bumped_at[name] = now
+
+    def recently_bumped(self, names: List[str], window: float) -> bool:
+        cutoff = time.monotonic() - window
+        return any(self._bumped_at.get(name, 0.0) > cutoff for name in names)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self.backend) if hasattr(self.backend, "__len__") else None,
+            "evictions": getattr(self.backend, "evictions", None),
+        }
+
+
+def make_etag(body: bytes) -> str:
+    # strong ETag: same bytes -> same tag
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware in front of the cached routes:
+    - hit  -> replay stored body (no DB, no serialization)
+    - miss -> run the route, store the 200 response
+    - If-None-Match equal to the ETag -> 304 with no body
+    """
+
+    def __init__(self, app, cache: ResponseCache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        deps = self.cache.dependencies(scope["path"], query)
+        if deps is None:
+            await self.app(scope, receive, send)
+            return
+
+        if replicas and pinned_to_primary(HTTPConnection(scope)):
+            # this client just wrote: answer from the primary, and don't
+            # let its cookie-specific view near the shared entries
+            await self.app(scope, receive, send)
+            return
+
+        versions = await self.cache.backend.get_versions(deps)
+        key = f"{scope['path']}?{urlencode(sorted(query.items()))}#{versions}"
+        if_none_match = None
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+                break
+
+        entry = await self.cache.backend.get(key)
+        if entry is not None:
+            self.cache.hits += 1
+            await self._send(send, entry, if_none_match)
+            return
+
+        self.cache.misses += 1
+        if replicas and self.cache.recently_bumped(deps, READ_YOUR_WRITES_SECONDS):
+            # replicas may still lag behind that write; fill the new version
+            # from the primary so stale rows aren't stored under it
+            scope = {**scope, READ_PRIMARY_SCOPE_KEY: True}
+        start = None
+        chunks = []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            else:
+                await send(message)
+
+        await self.app(scope, receive, capture)
+
+        body = b"".join(chunks)
+        if start["status"] != 200:
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        headers = [
+            (name, value) for name, value in start["headers"]
+            if name.lower() not in (b"content-length", b"etag", b"cache-control")
+        ]
+        entry = (start["status"], headers, body, make_etag(body))
+        if len(body) <= MAX_CACHED_BODY:
+            await self.cache.backend.set(key, entry)
+        await self._send(send, entry, if_none_match)
+
+    async def _send(self, send, entry: Entry, if_none_match: Optional[str]):
+        status, headers, body, etag = entry
+        # no-cache = browser may keep it, but must revalidate (cheap 304) each poll
+        extra = [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+
+        if _etag_matches(if_none_match, etag):
+            self.cache.not_modified += 1
+            await send({"type": "http.response.start", "status": 304, "headers": extra})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": headers + extra + [(b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+response_cache = ResponseCache()
@@ -1,7 +1,17 @@
 # app/db.py
+import asyncio
+import itertools
+import math
 import os
+import time
+from typing import List, Optional
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from fastapi import Request, Response
+from starlette.requests import HTTPConnection
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 # Loads DATABASE_URL from .env
@@ -16,19 +26,183 @@ if not DATABASE_URL:
         "Please create a .env file with DATABASE_URL=postgresql://..."
     )
 
+# Async drivers for the same database (psycopg 3 for Postgres, aiosqlite for local SQLite)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+psycopg",
+    "postgres": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def _async_url(url: str) -> str:
+    """
+    postgresql://... -> postgresql+psycopg://...  (same DB, async driver)
+    Can be overridden with ASYNC_DATABASE_URL.
+    """
+    parsed = make_url(url)
+    backend = parsed.drivername.split("+")[0]
+    return parsed.set(drivername=ASYNC_DRIVERS.get(backend, parsed.drivername)).render_as_string(
+        hide_password=False
+    )
+
+
+def _engine_options(url: str) -> dict:
+    """
+    Pool settings from the environment:
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING
+    """
+    options = {
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+    }
+    # SQLite uses a single-file / in-memory pool that doesn't take sizing options
+    if not url.startswith("sqlite"):
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        )
+    return options
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+
 # Engine = the connection "bridge" to PostgreSQL
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# (sync one is kept for the migration runner in app/migrations.py)
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 
 # SessionLocal = creates DB sessions when needed
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine + sessions used by the request handlers.
+# Concurrency is bounded by pool_size + max_overflow, not by a threadpool.
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL))
+
+# expire_on_commit=False: objects stay readable after commit without another SELECT
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 # Base = parent class for all our table models
 Base = declarative_base()
 
-# Dependency function: gives a DB session to each request, then closes it
-def get_db():
-    db = SessionLocal()
+
+# ---------------- read replicas ----------------
+# DATABASE_READ_URLS=postgresql://replica1/...,postgresql://replica2/...
+# Empty = every read goes to the primary, exactly as before.
+DATABASE_READ_URLS = [url.strip() for url in os.getenv("DATABASE_READ_URLS", "").split(",") if url.strip()]
+# round_robin | least_busy (fewest checked-out connections)
+DB_READ_STRATEGY = os.getenv("DB_READ_STRATEGY", "round_robin")
+# How often (seconds) a replica is pinged, and how long the ping may take
+DB_REPLICA_HEALTH_INTERVAL = float(os.getenv("DB_REPLICA_HEALTH_INTERVAL", "10"))
+DB_REPLICA_HEALTH_TIMEOUT = float(os.getenv("DB_REPLICA_HEALTH_TIMEOUT", "1"))
+# After a write, that client reads from the primary for this long (replica lag)
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+PRIMARY_PIN_COOKIE = "pawtrack_primary_until"
+# Set in the ASGI scope by middleware that needs this request served from the primary
+READ_PRIMARY_SCOPE_KEY = "pawtrack.read_primary"
+
+
+class Replica:
+    """
+    One read-only database: its own engine/pool + a cached health flag.
+    """
+
+    def __init__(self, url: str):
+        async_url = _async_url(url)
+        self.engine = create_async_engine(async_url, **_engine_options(async_url))
+        self.sessions = async_sessionmaker(
+            self.engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+        self.healthy = True
+        self.checked_at = 0.0
+
+    async def _ping(self):
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def is_healthy(self) -> bool:
+        # at most one ping per interval; in between the last answer is reused
+        if time.monotonic() - self.checked_at >= DB_REPLICA_HEALTH_INTERVAL:
+            self.checked_at = time.monotonic()
+            try:
+                await asyncio.wait_for(self._ping(), DB_REPLICA_HEALTH_TIMEOUT)
+                self.healthy = True
+            except (DBAPIError, OSError, asyncio.TimeoutError):
+                self.healthy = False
+        return self.healthy
+
+    def mark_down(self):
+        self.healthy = False
+        self.checked_at = time.monotonic()
+
+    def busy(self) -> int:
+        return self.engine.pool.checkedout()
+
+
+replicas: List[Replica] = [Replica(url) for url in DATABASE_READ_URLS]
+_round_robin = itertools.count()
+
+
+async def pick_replica() -> Optional[Replica]:
+    """
+    A healthy replica, or None = use the primary.
+    """
+    if not replicas:
+        return None
+    if DB_READ_STRATEGY == "least_busy":
+        candidates = sorted(replicas, key=Replica.busy)
+    else:
+        start = next(_round_robin) % len(replicas)
+        candidates = replicas[start:] + replicas[:start]
+    for replica in candidates:
+        if await replica.is_healthy():
+            return replica
+    return None
+
+
+def pinned_to_primary(request: HTTPConnection) -> bool:
+    """
+    True if this request must not read from a replica: its client wrote
+    within READ_YOUR_WRITES_SECONDS, or a middleware asked for the primary.
+    """
+    if request.scope.get(READ_PRIMARY_SCOPE_KEY):
+        return True
     try:
+        return float(request.cookies.get(PRIMARY_PIN_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+
+# Dependency function: gives an async DB session to each request, then closes it
+# (primary: use for anything that writes)
+async def get_db(response: Response):
+    if replicas:
+        # read-your-writes: this client's next reads skip the (maybe lagging) replicas
+        response.set_cookie(
+            PRIMARY_PIN_COOKIE,
+            str(time.time() + READ_YOUR_WRITES_SECONDS),
+            max_age=math.ceil(READ_YOUR_WRITES_SECONDS),
+            httponly=True,
+            samesite="lax",
+        )
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+# Dependency function for read-only routes: a replica session when one is
+# configured and healthy, otherwise the primary
+async def get_read_db(request: Request):
+    replica = None if pinned_to_primary(request) else await pick_replica()
+    if replica is None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    async with replica.sessions() as db:
+        try:
+            yield db
+        except DBAPIError as e:
+            if e.connection_invalidated:
+                replica.mark_down()  # next requests go elsewhere until it passes a ping
+            raise
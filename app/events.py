@@ -0,0 +1,293 @@
+# app/events.py
+"""
+Real-time pet events for GET /pets/stream (Server-Sent Events).
+
+create_pet / save_pet call pet_events.publish(db, ...) BEFORE commit:
+- Postgres: nothing to do there. AFTER INSERT / UPDATE triggers on pets
+  (PET_EVENTS_TRIGGER_DDL, migration 7) send the NOTIFY from inside the write
+  statement itself, so it costs no extra round trip, is only delivered if the
+  write commits, and reaches every worker via LISTEN.
+- other DBs: it is parked on the session and handed to this worker's
+  broadcaster in the session's after_commit hook (single-worker stand-in).
+
+Each client gets a bounded queue. A client that falls behind is cut off with
+a "reset" event (= refetch /pets) instead of slowing everyone else down.
+
+On Postgres every received event also runs pet_events.hooks, which is how
+writes on other workers reach this worker's response cache.
+"""
+import asyncio
+import json
+import logging
+import os
+import secrets
+from collections import deque
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import DDL, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .db import DATABASE_URL
+from .models import Pet
+from .schemas import PetOut
+from .serialization import PET_OUT_FIELDS, dumps
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "pawtrack_pet_events"
+# Events kept for Last-Event-ID resume
+PET_EVENTS_HISTORY = int(os.getenv("PET_EVENTS_HISTORY", "1000"))
+# Events a single slow client may have waiting before it's dropped
+PET_EVENTS_CLIENT_QUEUE = int(os.getenv("PET_EVENTS_CLIENT_QUEUE", "100"))
+HEARTBEAT_SECONDS = 15
+
+_PENDING_KEY = "pending_pet_events"
+
+# NOTIFY payload = {"type": ..., "data": <PetOut fields>}, built from the transition table
+_PET_JSON = "json_build_object(" + ", ".join(f"'{name}', n.{name}" for name in PET_OUT_FIELDS) + ")"
+
+# Statement-level so a bulk import (one multi-row INSERT / COPY per batch)
+# sends one pets_imported event instead of flooding every client.
+PET_EVENTS_TRIGGER_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION pawtrack_notify_pet_created() RETURNS trigger AS $$
+    DECLARE
+        inserted integer;
+    BEGIN
+        SELECT count(*) INTO inserted FROM new_rows;
+        IF inserted = 1 THEN
+            PERFORM pg_notify('{NOTIFY_CHANNEL}',
+                json_build_object('type', 'pet_created', 'data', {_PET_JSON})::text)
+            FROM new_rows AS n;
+        ELSIF inserted > 1 THEN
+            PERFORM pg_notify('{NOTIFY_CHANNEL}',
+                json_build_object('type', 'pets_imported', 'data', json_build_object('count', inserted))::text);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION pawtrack_notify_pet_adopted() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{NOTIFY_CHANNEL}',
+            json_build_object('type', 'pet_adopted', 'data', {_PET_JSON})::text)
+        FROM new_rows AS n JOIN old_rows AS o ON o.id = n.id
+        WHERE n.status = 'ADOPTED' AND o.status IS DISTINCT FROM 'ADOPTED';
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS pets_notify_created ON pets",
+    """
+    CREATE TRIGGER pets_notify_created AFTER INSERT ON pets
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION pawtrack_notify_pet_created()
+    """,
+    "DROP TRIGGER IF EXISTS pets_notify_adopted ON pets",
+    """
+    CREATE TRIGGER pets_notify_adopted AFTER UPDATE ON pets
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION pawtrack_notify_pet_adopted()
+    """,
+]
+
+for statement in PET_EVENTS_TRIGGER_DDL:
+    event.listen(Pet.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+
+class Subscriber:
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+
+class PetEventBroadcaster:
+    def __init__(self, history: int = PET_EVENTS_HISTORY, client_queue: int = PET_EVENTS_CLIENT_QUEUE):
+        self.client_queue = client_queue
+        self._subscribers = set()
+        self._history = deque(maxlen=history)
+        # ids are "<epoch>-<seq>": seq counts dispatched events, so they follow
+        # commit order; a new epoch (restart, listener gap) makes older ids unknown
+        self._epoch = secrets.token_hex(4)
+        self._seq = 0
+        self._listener: Optional[asyncio.Task] = None
+        # async callables run with every event received over LISTEN (Postgres only)
+        self.hooks: List[Callable[[dict], Awaitable[None]]] = []
+        self._postgres = make_url(DATABASE_URL).get_backend_name() == "postgresql"
+
+    def _reset_event(self) -> dict:
+        return {"id": f"{self._epoch}-{self._seq}", "type": "reset", "data": {}}
+
+    def _missed_since(self, last_event_id: str) -> Optional[list]:
+        """
+        Events dispatched after last_event_id, or None if we can't tell
+        (another worker / epoch, or already dropped from history).
+        """
+        epoch, _, seq = last_event_id.rpartition("-")
+        if epoch != self._epoch or not seq.isdigit():
+            return None
+        # history holds a contiguous run of seqs ending at self._seq
+        first = self._seq - len(self._history) + 1
+        position = int(seq) - first + 1
+        if not 0 <= position <= len(self._history):
+            return None
+        return list(self._history)[position:]
+
+    # ---------------- publishing ----------------
+
+    def publish(self, db: AsyncSession, event_type: str, pet: Pet):
+        """
+        Call before db.commit(); the event is only sent if the commit succeeds.
+        """
+        if db.bind.dialect.name == "postgresql":
+            return  # the pets triggers already queued the NOTIFY
+        data = PetOut.model_validate(pet).model_dump(mode="json")
+        db.sync_session.info.setdefault(_PENDING_KEY, []).append({"type": event_type, "data": data})
+
+    def imported(self, db: AsyncSession, count: int):
+        """
+        Call after a bulk batch committed (on Postgres the insert trigger sent it).
+        """
+        if db.bind.dialect.name != "postgresql":
+            self.dispatch({"type": "pets_imported", "data": {"count": count}})
+
+    def dispatch(self, event: dict):
+        """
+        Hands a committed event to every local subscriber (never blocks).
+        Called in commit order, which is where the event gets its id.
+        """
+        self._seq += 1
+        payload = {"id": f"{self._epoch}-{self._seq}", **event}
+        self._history.append(payload)
+
+        for subscriber in list(self._subscribers):
+            if subscriber.overflowed:
+                continue
+            try:
+                subscriber.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # too slow: drop what's queued and tell it to resync
+                subscriber.overflowed = True
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(self._reset_event())
+
+    # ---------------- subscribing ----------------
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        """
+        New client. With last_event_id, replays what it missed from history,
+        or sends a reset if that's more than we remember / can queue.
+        """
+        self.start()
+        subscriber = Subscriber(self.client_queue)
+
+        if last_event_id is not None:
+            missed = self._missed_since(last_event_id)
+            if missed is None or len(missed) >= self.client_queue:
+                subscriber.queue.put_nowait(self._reset_event())
+            else:
+                for payload in missed:
+                    subscriber.queue.put_nowait(payload)
+
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    # ---------------- Postgres LISTEN ----------------
+
+    def start(self):
+        """
+        Starts this worker's LISTEN task if it isn't running (no-op off Postgres).
+        """
+        if self._postgres and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _receive(self, event: dict):
+        for hook in self.hooks:
+            try:
+                await hook(event)
+            except Exception:
+                logger.exception("pet events hook failed")
+        self.dispatch(event)
+
+    async def _listen(self):
+        """
+        One LISTEN connection per worker; reconnects with backoff.
+        """
+        import psycopg
+
+        conninfo = make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        delay = 1.0
+        gap = False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                    delay = 1.0
+                    if gap:
+                        # events sent while we were away are gone: everyone resyncs
+                        await self._receive({"type": "reset", "data": {}})
+                        gap = False
+                    async for notify in conn.notifies():
+                        await self._receive(json.loads(notify.payload))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("pet events listener failed, retrying in %.0fs", delay)
+                # anything sent while we were away is lost -> resuming clients must reset
+                self._epoch = secrets.token_hex(4)
+                self._history.clear()
+                gap = True
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+
+def format_sse(payload: dict) -> bytes:
+    return (
+        f"id: {payload['id']}\nevent: {payload['type']}\n".encode()
+        + b"data: " + dumps(payload["data"]) + b"\n\n"
+    )
+
+
+async def sse_stream(request, subscriber: Subscriber):
+    """
+    Body of GET /pets/stream: events as they come, a comment line as heartbeat.
+    """
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                payload = await asyncio.wait_for(subscriber.queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield b": keep-alive\n\n"
+                continue
+            yield format_sse(payload)
+            if subscriber.overflowed and payload["type"] == "reset":
+                break
+    finally:
+        pet_events.unsubscribe(subscriber)
+
+
+pet_events = PetEventBroadcaster()
+
+
+# Local (non-Postgres) delivery: only after the transaction really committed
+@event.listens_for(Session, "after_commit")
+def _dispatch_pending(session):
+    for payload in session.info.pop(_PENDING_KEY, []):
+        pet_events.dispatch(payload)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
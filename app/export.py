@@ -0,0 +1,77 @@
+# app/export.py
+import csv
+import io
+import os
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import or_, select
+
+from .db import AsyncSessionLocal, Replica
+from .models import Pet
+from .serialization import dumps
+
+# Columns written by GET /pets/export (in this order for CSV)
+EXPORT_COLUMNS = [
+    "id", "title", "species", "description", "photo_url", "location_url", "location_text",
+    "latitude", "longitude", "status", "created_at", "adopted_at",
+]
+
+# Rows fetched from the server-side cursor per round trip (= per chunk sent)
+EXPORT_CHUNK_ROWS = 1000
+
+# How far X-Export-Watermark is set back from "now". created_at / adopted_at
+# are stamped by the app before commit (a bulk batch up to a whole batch
+# earlier), so a row still in flight when the export starts can carry a
+# time below "now" and only become visible afterwards.
+EXPORT_WATERMARK_MARGIN_SECONDS = float(os.getenv("EXPORT_WATERMARK_MARGIN_SECONDS", "300"))
+
+
+def _csv_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _ndjson_chunk(rows) -> bytes:
+    return b"".join(dumps(dict(zip(EXPORT_COLUMNS, row))) + b"\n" for row in rows)
+
+
+def _csv_chunk(rows) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerows([[_csv_value(value) for value in row] for row in rows])
+    return out.getvalue().encode()
+
+
+async def stream_pets(
+    fmt: str,
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    replica: Optional[Replica] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Yields the export one chunk at a time from a server-side cursor.
+    Only EXPORT_CHUNK_ROWS rows are in memory at once, whatever the table size.
+
+    since   -> only pets created OR adopted after that moment (incremental runs).
+    replica -> read from it instead of the primary (the caller picks it, so the
+               watermark it hands out can allow for replica lag).
+    """
+    query = select(*[getattr(Pet, name) for name in EXPORT_COLUMNS]).order_by(Pet.id)
+    if status:
+        query = query.where(Pet.status == status.upper())
+    if since:
+        query = query.where(or_(Pet.created_at > since, Pet.adopted_at > since))
+
+    if fmt == "csv":
+        out = io.StringIO()
+        csv.writer(out).writerow(EXPORT_COLUMNS)
+        yield out.getvalue().encode()
+
+    encode = _csv_chunk if fmt == "csv" else _ndjson_chunk
+
+    # Own session: the stream outlives the request's dependencies.
+    sessions = replica.sessions if replica else AsyncSessionLocal
+    async with sessions() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        async for rows in result.partitions():
+            yield encode(rows)
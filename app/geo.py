@@ -0,0 +1,118 @@
+# app/geo.py
+import math
+import re
+from typing import List, Optional, Tuple
+from urllib.parse import unquote
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Geocell = a geohash kept as an integer (interleaved lng/lat bits).
+# Integers sort the same way everywhere, so a plain BTREE index works for
+# prefix (= "same cell") lookups on both Postgres and SQLite.
+GEOCELL_BITS = 60
+
+# Patterns Google Maps uses to put coordinates in a link
+_COORD = r"(-?\d{1,3}(?:\.\d+)?)"
+_URL_PATTERNS = [
+    re.compile(r"!3d" + _COORD + r"!4d" + _COORD),              # .../data=!3d6.92!4d79.86 (exact pin)
+    re.compile(r"[?&](?:q|query|ll|center|destination|daddr)=(?:loc:)?" + _COORD + r"\s*,\s*" + _COORD),
+    re.compile(r"@" + _COORD + r"," + _COORD),                    # .../@6.92,79.86,15z (map view)
+]
+
+
+def parse_coordinates(location_url: Optional[str]) -> Optional[Tuple[float, float]]:
+    """
+    Pulls (lat, lng) out of a Google Maps link.
+    Returns None for links without coordinates (e.g. short maps.app.goo.gl links).
+    """
+    if not location_url:
+        return None
+    url = unquote(location_url)
+    for pattern in _URL_PATTERNS:
+        match = pattern.search(url)
+        if match:
+            lat, lng = float(match.group(1)), float(match.group(2))
+            if -90 <= lat <= 90 and -180 <= lng <= 180:
+                return lat, lng
+    return None
+
+
+def encode_geocell(lat: float, lng: float, bits: int = GEOCELL_BITS) -> int:
+    """
+    Geohash bit-interleaving (longitude first), returned as an int with `bits` bits.
+    """
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    cell = 0
+    for i in range(bits):
+        cell <<= 1
+        if i % 2 == 0:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                cell |= 1
+                lng_lo = mid
+            else:
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                cell |= 1
+                lat_lo = mid
+            else:
+                lat_hi = mid
+    return cell
+
+
+def location_fields(location_url: Optional[str]) -> dict:
+    """
+    Column values (latitude / longitude / geocell) for a pet's location_url.
+    """
+    coords = parse_coordinates(location_url)
+    if coords is None:
+        return {"latitude": None, "longitude": None, "geocell": None}
+    lat, lng = coords
+    return {"latitude": lat, "longitude": lng, "geocell": encode_geocell(lat, lng)}
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _cell_size_deg(bits: int) -> Tuple[float, float]:
+    """(height, width) in degrees of a cell with `bits` bits."""
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def nearby_ranges(lat: float, lng: float, radius_km: float) -> List[Tuple[int, int]]:
+    """
+    Geocell ranges [lo, hi) that together cover a circle around (lat, lng).
+
+    Picks the smallest cell that is still at least radius_km wide, then takes
+    that cell + its 8 neighbours. Each range is one index range scan.
+    """
+    km_per_deg_lat = math.pi * EARTH_RADIUS_KM / 180
+    km_per_deg_lng = km_per_deg_lat * max(math.cos(math.radians(lat)), 0.01)
+
+    bits = GEOCELL_BITS
+    while bits > 0:
+        height, width = _cell_size_deg(bits)
+        if height * km_per_deg_lat >= radius_km and width * km_per_deg_lng >= radius_km:
+            break
+        bits -= 1
+    height, width = _cell_size_deg(bits)
+
+    cells = set()
+    for dlat in (-height, 0.0, height):
+        for dlng in (-width, 0.0, width):
+            nlat = min(max(lat + dlat, -90.0), 90.0)
+            nlng = (lng + dlng + 180.0) % 360.0 - 180.0
+            cells.add(encode_geocell(nlat, nlng, bits))
+
+    shift = GEOCELL_BITS - bits
+    return [(cell << shift, (cell + 1) << shift) for cell in sorted(cells)]
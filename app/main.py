@@ -1,22 +1,63 @@
 # app/main.py
-from datetime import datetime
-from fastapi import FastAPI, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from sqlalchemy import and_, insert, or_, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 from .models import User, Pet
 from .schemas import (
     UserRegister, UserLogin, UserOut, TokenOut,
-    PetCreate, PetOut
+    PetCreate, PetOut, PetPage, PetNearbyOut, BulkImportReport
+)
+from .auth_utils import hash_password_async, verify_and_update_password, create_access_token
+from .db import (
+    engine, async_engine, replicas, get_db, get_read_db,
+    pick_replica, pinned_to_primary, READ_YOUR_WRITES_SECONDS
 )
-from .auth_utils import hash_password, verify_password, create_access_token
-from .db import Base, engine, get_db
 from .auth_dep import get_current_user_id
-from .bot_knowledge import FAQ
+from .bot_knowledge import match_rule, match_species
+from .stats import pet_counters
+from .cache import ResponseCacheMiddleware, response_cache
+from .bulk import import_pets
+from .export import stream_pets, EXPORT_WATERMARK_MARGIN_SECONDS
+from .search import tokenize, postgres_search_query, search_index
+from .migrations import require_current_schema
+from .metrics import MetricsMiddleware, instrument_engine, collectors, stats_collector
+from .pagination import encode_cursor, decode_cursor
+from .geo import location_fields, nearby_ranges, haversine_km
+from .serialization import PET_OUT_COLUMNS, pet_dicts, FastJSONResponse
+from .events import pet_events, sse_stream
+
+
+async def bump_cache_for_event(event: dict):
+    """
+    Writes made by OTHER workers arrive here as pet events (Postgres LISTEN),
+    so this worker's cached /pets pages are dropped too, not just the writer's.
+    """
+    if event["type"] == "pet_created":
+        await response_cache.bump(event["data"]["status"])
+    else:  # pet_adopted, pets_imported, reset
+        await response_cache.bump("AVAILABLE", "ADOPTED")
 
 
-app = FastAPI(title="PawTrack API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # ✅ Postgres: listen from startup, not from the first /pets/stream client,
+    # so cache invalidation from other workers never waits on a subscriber
+    pet_events.start()
+    yield
+
+
+# ✅ no create_all here: schema is applied at deploy time by `python -m app.migrations`.
+# Workers just check the version once (lazily, on the first request).
+app = FastAPI(
+    title="PawTrack API", dependencies=[Depends(require_current_schema)], lifespan=lifespan
+)
 
 origins = [
     "http://localhost:3000",
@@ -25,6 +66,10 @@ origins = [
     "http://127.0.0.1:3001",
 ]
 
+# ✅ serves repeated GET /pets and /pets/{id} from memory (ETag / 304 aware).
+# Added before CORS so CORS stays the outer layer and also covers cached replies.
+app.add_middleware(ResponseCacheMiddleware, cache=response_cache)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -33,114 +78,332 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-Base.metadata.create_all(bind=engine)
-
+# ✅ outermost: times every request (cache hits too) and serves GET /metrics
+app.add_middleware(MetricsMiddleware, routes=app.router.routes)
+instrument_engine(async_engine.sync_engine, "primary")
+instrument_engine(engine, "sync")
+for index, replica in enumerate(replicas):
+    instrument_engine(replica.engine.sync_engine, f"replica{index}")
+collectors.append(stats_collector(
+    "response_cache", response_cache.stats, counters=("hits", "misses", "not_modified", "evictions")
+))
+pet_events.hooks.append(bump_cache_for_event)
 
 @app.get("/")
-def health_check():
+async def health_check():
     return {"message": "PawTrack backend running ✅"}
 
 
 @app.post("/pets", response_model=PetOut)
-def create_pet(payload: PetCreate, db: Session = Depends(get_db)):
+async def create_pet(payload: PetCreate, db: AsyncSession = Depends(get_db)):
     # ✅ safer than model_dump for beginners
-    pet = Pet(**payload.dict())
-    db.add(pet)
-    db.commit()
-    db.refresh(pet)
+    values = payload.dict()
+    # ✅ store coordinates from the maps link so /pets/nearby can use the index
+    values.update(location_fields(payload.location_url))
+    # INSERT ... RETURNING: the new row (id, defaults) comes back in the same round trip
+    pet = await db.scalar(insert(Pet).values(**values).returning(Pet))
+    # ✅ sent to /pets/stream listeners only if the commit succeeds
+    pet_events.publish(db, "pet_created", pet)
+    await db.commit()
+    pet_counters.add(pet.status, pet.species)
+    await response_cache.bump(pet.status)
+    search_index.add(
+        pet.id, pet.status, pet.species,
+        title=pet.title, description=pet.description, location_text=pet.location_text,
+    )
     return pet
 
 
-# ✅ UPDATED: supports status filter
-@app.get("/pets", response_model=List[PetOut])
-def list_pets(
-    db: Session = Depends(get_db),
-    status: Optional[str] = Query(default="AVAILABLE")  # AVAILABLE by default
+@app.post("/pets/bulk", response_model=BulkImportReport)
+async def bulk_import_pets(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    POST /pets/bulk -> import many pets in one upload (for partner shelters)
+    - Content-Type: application/x-ndjson -> one PetCreate JSON object per line
+    - Content-Type: text/csv             -> header row + one pet per row
+    The body is read as a stream and inserted in batches, so any size works.
+    Bad lines don't stop the import; they are listed in the report.
+    """
+    content_type = request.headers.get("content-type", "")
+    fmt = "csv" if "csv" in content_type else "ndjson"
+
+    async def after_batch(rows):
+        for row in rows:
+            pet_counters.add(row["status"], row["species"])
+        await response_cache.bump("AVAILABLE")
+        pet_events.imported(db, len(rows))
+        # bulk rows come back without ids -> rebuild on the next search
+        search_index.invalidate()
+
+    return await import_pets(request.stream(), fmt, db, on_batch=after_batch)
+
+
+# ✅ UPDATED: supports status filter + cursor pagination
+@app.get("/pets", response_model=PetPage)
+async def list_pets(
+    db: AsyncSession = Depends(get_read_db),
+    status: Optional[str] = Query(default="AVAILABLE"),  # AVAILABLE by default
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None),
 ):
     """
-    GET /pets -> returns pets filtered by status
-    - /pets                 -> AVAILABLE
-    - /pets?status=ADOPTED  -> ADOPTED
+    GET /pets -> returns one page of pets filtered by status (newest first)
+    - /pets                         -> first page of AVAILABLE
+    - /pets?status=ADOPTED          -> first page of ADOPTED
+    - /pets?cursor=<next_cursor>    -> next page
+    Uses keyset pagination on (created_at, id), so page 500 is as cheap as page 1.
     """
     status_upper = (status or "AVAILABLE").upper()
-    pets = (
-        db.query(Pet)
-        .filter(Pet.status == status_upper)
-        .order_by(Pet.created_at.desc())
-        .all()
+    # ✅ only the PetOut columns, as plain tuples (no ORM objects to build)
+    query = select(*PET_OUT_COLUMNS).where(Pet.status == status_upper)
+
+    if cursor:
+        created_at, pet_id = decode_cursor(cursor)
+        query = query.where(tuple_(Pet.created_at, Pet.id) < (created_at, pet_id))
+
+    # fetch one extra row to know whether another page exists
+    result = await db.execute(
+        query.order_by(Pet.created_at.desc(), Pet.id.desc()).limit(limit + 1)
+    )
+    pets = pet_dicts(result)
+
+    next_cursor = None
+    if len(pets) > limit:
+        pets = pets[:limit]
+        last = pets[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+
+    return FastJSONResponse({"items": pets, "next_cursor": next_cursor})
+
+
+# ⚠️ must be declared before /pets/{pet_id}
+@app.get("/pets/nearby", response_model=List[PetNearbyOut])
+async def nearby_pets(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(default=5, gt=0, le=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    status: Optional[str] = Query(default="AVAILABLE"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    GET /pets/nearby?lat=6.92&lng=79.86&radius_km=5 -> closest pets first
+    Only rows in the 9 geocells around the point are read (index range scans),
+    exact distance is then checked on that small candidate set.
+    """
+    status_upper = (status or "AVAILABLE").upper()
+    cells = [
+        and_(Pet.geocell >= lo, Pet.geocell < hi)
+        for lo, hi in nearby_ranges(lat, lng, radius_km)
+    ]
+    candidates = (
+        await db.scalars(
+            select(Pet).where(or_(*cells)).where(Pet.status == status_upper)
+        )
+    ).all()
+
+    results = []
+    for pet in candidates:
+        distance = haversine_km(lat, lng, pet.latitude, pet.longitude)
+        if distance <= radius_km:
+            pet.distance_km = round(distance, 3)
+            results.append(pet)
+
+    results.sort(key=lambda p: p.distance_km)
+    return results[:limit]
+
+
+# ⚠️ must be declared before /pets/{pet_id}
+@app.get("/pets/search", response_model=List[PetOut])
+async def search_pets(
+    q: str = Query(..., min_length=1, max_length=200),
+    status: Optional[str] = Query(default="AVAILABLE"),
+    species: Optional[str] = Query(default=None, pattern="^(DOG|CAT|dog|cat)$"),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    GET /pets/search?q=ginger cat colombo -> best matches first
+    Searches title, location_text and description (in that order of weight).
+    Every word must match, the start of a word is enough ("gin" finds "ginger").
+    - Postgres: tsvector column + GIN index
+    - other DBs: in-memory inverted index (app/search.py)
+    """
+    terms = tokenize(q)
+    if not terms:
+        return FastJSONResponse([])
+    status_upper = status.upper() if status else None
+    species_upper = species.upper() if species else None
+
+    if db.bind.dialect.name == "postgresql":
+        query = postgres_search_query(terms, status_upper, species_upper, limit)
+        return FastJSONResponse(pet_dicts(await db.execute(query)))
+
+    await search_index.ensure_loaded(db)
+    ids = search_index.search(terms, status_upper, species_upper, limit)
+    if not ids:
+        return FastJSONResponse([])
+    rows = await db.execute(select(*PET_OUT_COLUMNS).where(Pet.id.in_(ids)))
+    pets = {pet["id"]: pet for pet in pet_dicts(rows)}
+    return FastJSONResponse([pets[pet_id] for pet_id in ids if pet_id in pets])
+
+
+# ⚠️ must be declared before /pets/{pet_id}
+@app.get("/pets/stream")
+async def stream_pet_events(request: Request, last_event_id: Optional[str] = Query(default=None)):
+    """
+    GET /pets/stream -> Server-Sent Events instead of polling GET /pets
+    - event: pet_created / pet_adopted  (data = the pet, like PetOut)
+    - event: pets_imported (data = {"count": n}) -> a bulk import added pets
+    - event: reset -> you missed too much, refetch /pets then keep listening
+    Browsers' EventSource resends Last-Event-ID on reconnect, so nothing is lost
+    in short disconnects (?last_event_id= works too). Ids are per worker:
+    resuming on another worker or after a restart gets a reset.
+    """
+    last_event_id = request.headers.get("last-event-id") or last_event_id
+
+    subscriber = pet_events.subscribe(last_event_id)
+    return StreamingResponse(
+        sse_stream(request, subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ⚠️ must be declared before /pets/{pet_id}
+@app.get("/pets/export")
+async def export_pets(
+    request: Request,
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    status: Optional[str] = Query(default=None),  # all statuses by default
+    since: Optional[datetime] = Query(default=None),
+):
+    """
+    GET /pets/export -> streams every pet as NDJSON or CSV (for nightly analytics)
+    - /pets/export?format=csv&status=ADOPTED
+    - /pets/export?since=<X-Export-Watermark of the previous run> -> only changes
+    Consecutive runs overlap on purpose (see EXPORT_WATERMARK_MARGIN_SECONDS),
+    so a pet can show up in two runs: dedupe by id, keeping the latest row.
+    """
+    # Taken before reading and set back by a margin, so rows whose transaction
+    # was still open when we started are picked up by the next run
+    watermark = datetime.utcnow() - timedelta(seconds=EXPORT_WATERMARK_MARGIN_SECONDS)
+    # analytics reads go to a replica unless this client just wrote
+    replica = None if pinned_to_primary(request) else await pick_replica()
+    if replica:
+        # rows committed on the primary may not have reached the replica yet:
+        # hand out an earlier watermark so the next run picks them up
+        watermark -= timedelta(seconds=READ_YOUR_WRITES_SECONDS)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_pets(format, status, since, replica),
+        media_type=media_type,
+        headers={
+            "X-Export-Watermark": watermark.isoformat(),
+            "Content-Disposition": f'attachment; filename="pets.{format}"',
+        },
     )
-    return pets
 
 
 @app.get("/pets/{pet_id}", response_model=PetOut)
-def get_pet(pet_id: int, db: Session = Depends(get_db)):
-    pet = db.query(Pet).filter(Pet.id == pet_id).first()
+async def get_pet(pet_id: int, db: AsyncSession = Depends(get_read_db)):
+    pet = await db.get(Pet, pet_id)
     if not pet:
         raise HTTPException(status_code=404, detail="Pet not found")
     return pet
 
 
 @app.post("/pets/{pet_id}/save", response_model=PetOut)
-def save_pet(
+async def save_pet(
     pet_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     user_id: int = Depends(get_current_user_id),
 ):
     """
     Only logged-in users can adopt/save pets.
+    One conditional UPDATE: if two users adopt at the same time, only one wins,
+    the other gets 409.
     """
-    pet = db.query(Pet).filter(Pet.id == pet_id).first()
+    pet = await db.scalar(
+        update(Pet)
+        .where(Pet.id == pet_id, Pet.status == "AVAILABLE")
+        .values(status="ADOPTED", adopted_at=datetime.utcnow())
+        .returning(Pet)
+        .execution_options(synchronize_session=False)
+    )
     if not pet:
-        raise HTTPException(status_code=404, detail="Pet not found")
-
-    pet.status = "ADOPTED"
-    pet.adopted_at = datetime.utcnow()
-    db.commit()
-    db.refresh(pet)
+        # nothing updated -> find out why (only on the failure path)
+        exists = await db.scalar(select(Pet.id).where(Pet.id == pet_id))
+        if exists is None:
+            raise HTTPException(status_code=404, detail="Pet not found")
+        raise HTTPException(status_code=409, detail="Pet is already adopted")
+    pet_events.publish(db, "pet_adopted", pet)
+    await db.commit()
+
+    pet_counters.move(pet.species, "AVAILABLE", pet.status)
+    await response_cache.bump("AVAILABLE", pet.status)
+    search_index.update_status(pet.id, pet.status)
 
     return pet
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """
+    Hit / miss numbers for the GET /pets response cache.
+    """
+    return response_cache.stats()
+
+
 # ---------------- USER AUTH ----------------
 
 @app.post("/auth/register", response_model=UserOut)
-def register_user(payload: UserRegister, db: Session = Depends(get_db)):
+async def register_user(payload: UserRegister, db: AsyncSession = Depends(get_db)):
     if payload.password != payload.confirm_password:
         raise HTTPException(status_code=400, detail="Passwords do not match")
 
-    existing = db.query(User).filter(User.email == payload.email).first()
-    if existing:
+    # bcrypt runs on its own executor, off the event loop
+    hashed = await hash_password_async(payload.password)
+
+    # ✅ no SELECT first: the unique index on email rejects duplicates for us
+    try:
+        user = await db.scalar(
+            insert(User)
+            .values(
+                full_name=payload.full_name,
+                email=payload.email,
+                phone_number=payload.phone_number,
+                password_hash=hashed
+            )
+            .returning(User)
+        )
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
         raise HTTPException(status_code=409, detail="Email already registered")
 
-    hashed = hash_password(payload.password)
-
-    user = User(
-        full_name=payload.full_name,
-        email=payload.email,
-        phone_number=payload.phone_number,
-        password_hash=hashed
-    )
-
-    db.add(user)
-    db.commit()
-    db.refresh(user)
     return user
 
 
 @app.post("/auth/login", response_model=TokenOut)
-def login_user(payload: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email).first()
+async def login_user(payload: UserLogin, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.email == payload.email))
     if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    if not verify_password(payload.password, user.password_hash):
+    valid, new_hash = await verify_and_update_password(payload.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
+    # ✅ hash was made with an older bcrypt cost -> store the upgraded one
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
     token = create_access_token({"sub": str(user.id), "email": user.email})
     return {"access_token": token, "token_type": "bearer"}
 
 @app.post("/chat")
-def chat_bot(payload: dict, db: Session = Depends(get_db)):
+async def chat_bot(payload: dict, db: AsyncSession = Depends(get_read_db)):
     """
     Free rule-based chatbot endpoint.
     Expects: { "message": "text..." }
@@ -151,20 +414,18 @@ def chat_bot(payload: dict, db: Session = Depends(get_db)):
     if not message:
         return {"reply": "Please type a message 😊"}
 
-    # ✅ DB-powered answers (live info)
-    if "available" in message and ("pets" in message or "pet" in message):
-        count = db.query(Pet).filter(Pet.status == "AVAILABLE").count()
-        return {"reply": f"Right now, there are {count} pets available on PawTrack 🐾"}
+    rule = match_rule(message)
 
-    if "adopted" in message:
-        count = db.query(Pet).filter(Pet.status == "ADOPTED").count()
-        return {"reply": f"So far, {count} pets have been adopted 🎉"}
+    # ✅ Live info from in-memory counters (no COUNT(*) per message)
+    if rule and "status" in rule:
+        species = match_species(message)
+        count = await pet_counters.count(db, status=rule["status"], species=species)
+        noun = {"DOG": "dogs", "CAT": "cats"}.get(species, "pets")
+        return {"reply": rule["answer"].format(count=count, noun=noun)}
 
     # ✅ Rule-based FAQ answers
-    for item in FAQ:
-        for tag in item["tags"]:
-            if tag in message:
-                return {"reply": item["answer"]}
+    if rule:
+        return {"reply": rule["answer"]}
 
     # ✅ fallback
     return {
@@ -0,0 +1,279 @@
+# app/metrics.py
+"""
+Built-in Prometheus metrics (no extra dependency):
+- per-route latency histogram + request counter by status code
+- SQL statements per request and their time (SQLAlchemy engine events)
+- connection pool checkout wait, size, checked-out and overflow
+Served as text at GET /metrics by MetricsMiddleware.
+"""
+import contextvars
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(key, le=_num(bound))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(key, le='+Inf')} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(key)} {_num(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(key)} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._series: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = tuple(sorted(labels.items()))
+        self._series[key] = self._series.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in self._series.items():
+            lines.append(f"{self.name}{_labels(key)} {_num(value)}")
+        return lines
+
+
+def _num(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: Labels, **extra: str) -> str:
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route", LATENCY_BUCKETS
+)
+REQUESTS = Counter("http_requests_total", "Requests by route and status code")
+REQUEST_SQL = Histogram(
+    "http_request_sql_statements", "SQL statements run per request (N+1 shows up here)", SQL_COUNT_BUCKETS
+)
+REQUEST_SQL_TIME = Histogram(
+    "http_request_sql_duration_seconds", "Total SQL time per request", LATENCY_BUCKETS
+)
+SQL_STATEMENTS = Counter("db_statements_total", "SQL statements executed")
+SQL_TIME = Counter("db_statement_duration_seconds_total", "Time spent executing SQL")
+POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time waiting for a pooled connection", LATENCY_BUCKETS
+)
+
+# [statements, seconds] for the request being handled (None outside requests)
+_request_sql: contextvars.ContextVar = contextvars.ContextVar("request_sql", default=None)
+
+_engines: Dict[str, object] = {}
+
+# Extra text sources, e.g. the response cache stats (each returns lines)
+collectors: List[Callable[[], List[str]]] = []
+
+
+def stats_collector(
+    prefix: str, stats: Callable[[], dict], counters: Iterable[str] = ()
+) -> Callable[[], List[str]]:
+    """
+    Exposes every number in a stats() dict, e.g. response_cache_entries.
+    Keys listed in `counters` only ever go up: they become counters named
+    <prefix>_<key>_total, everything else is a gauge.
+    """
+    counters = set(counters)
+
+    def collect() -> List[str]:
+        lines = []
+        for key, value in stats().items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if key in counters:
+                    metric, kind = f"{prefix}_{key}_total", "counter"
+                else:
+                    metric, kind = f"{prefix}_{key}", "gauge"
+                lines += [f"# TYPE {metric} {kind}", f"{metric} {_num(value)}"]
+        return lines
+    return collect
+
+
+# ---------------- SQLAlchemy instrumentation ----------------
+
+def instrument_engine(engine, name: str):
+    """
+    Counts statements/time and measures pool checkout wait for one engine.
+    Pass `async_engine.sync_engine` for async engines.
+    """
+    if name in _engines:
+        return
+    _engines[name] = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        _record(conn.info["query_start"].pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        # after_cursor_execute never runs for a failed statement: pop its start
+        # here, or it stays on the pooled connection forever
+        conn = exception_context.connection
+        if (
+            conn is not None
+            and exception_context.execution_context is not None
+            and conn.info.get("query_start")
+        ):
+            _record(conn.info["query_start"].pop())
+
+    def _record(start: float):
+        elapsed = time.perf_counter() - start
+        SQL_STATEMENTS.inc(engine=name)
+        SQL_TIME.inc(elapsed, engine=name)
+        stats = _request_sql.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += elapsed
+
+    # The pool has no "before checkout" event, so time its _do_get directly
+    pool = engine.pool
+    do_get = pool._do_get
+
+    def timed_do_get():
+        start = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - start, engine=name)
+
+    pool._do_get = timed_do_get
+
+
+def _pool_lines() -> List[str]:
+    gauges = {
+        "db_pool_size": ("Configured pool size", "size"),
+        "db_pool_checked_out": ("Connections currently in use", "checkedout"),
+        "db_pool_checked_in": ("Idle connections in the pool", "checkedin"),
+        "db_pool_overflow": ("Connections opened beyond pool_size", "overflow"),
+    }
+    lines = []
+    for metric, (help_text, method) in gauges.items():
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+        for name, engine in _engines.items():
+            getter = getattr(engine.pool, method, None)
+            if getter is not None:
+                # SQLAlchemy's overflow() starts at -pool_size; 0 = nothing beyond the pool
+                value = max(getter(), 0) if method == "overflow" else getter()
+                lines.append(f"{metric}{_labels((('engine', name),))} {value}")
+    return lines
+
+
+def render() -> str:
+    lines = []
+    for metric in (REQUESTS, REQUEST_LATENCY, REQUEST_SQL, REQUEST_SQL_TIME,
+                   SQL_STATEMENTS, SQL_TIME, POOL_WAIT):
+        lines += metric.render()
+    lines += _pool_lines()
+    for collect in collectors:
+        lines += collect()
+    return "\n".join(lines) + "\n"
+
+
+# ---------------- HTTP middleware ----------------
+
+class MetricsMiddleware:
+    """
+    Outermost ASGI middleware: times every request (cache hits included),
+    labels it with the route template ("/pets/{pet_id}", not "/pets/42")
+    and answers GET /metrics itself.
+    """
+
+    def __init__(self, app, routes, path: str = "/metrics"):
+        self.app = app
+        self.routes = routes
+        self.path = path
+
+    def _route_of(self, scope) -> str:
+        route = scope.get("route")
+        if route is not None:
+            return route.path
+        # request never reached the router (e.g. served from the response cache)
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["path"] == self.path and scope["method"] == "GET":
+            body = render().encode()
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/plain; version=0.0.4; charset=utf-8")],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        status_code = 500
+        stats = [0, 0.0]
+        token = _request_sql.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_sql.reset(token)
+            route = self._route_of(scope)
+            method = scope["method"]
+            REQUEST_LATENCY.observe(elapsed, method=method, route=route)
+            REQUESTS.inc(method=method, route=route, status=str(status_code))
+            REQUEST_SQL.observe(stats[0], method=method, route=route)
+            REQUEST_SQL_TIME.observe(stats[1], method=method, route=route)
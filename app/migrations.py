@@ -0,0 +1,240 @@
+# app/migrations.py
+"""
+Versioned schema migrations (replaces create_all at import + one-off scripts).
+
+Run once per deploy, NOT in every worker:
+    python -m app.migrations upgrade   -> apply everything that's missing
+    python -m app.migrations status    -> show applied / pending versions
+
+Workers only check the version table once (require_current_schema).
+"""
+import argparse
+import time
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from .db import Base, engine, async_engine
+from .events import PET_EVENTS_TRIGGER_DDL
+from .geo import location_fields
+from .models import PETS_SEARCH_VECTOR_DDL
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+# Any constant works, it just has to be the same in every runner
+MIGRATION_LOCK_ID = 74_220_001
+
+# While the schema is behind, workers re-check at most this often (seconds)
+SCHEMA_RECHECK_SECONDS = 5.0
+
+
+# ---------------- helpers ----------------
+
+def _add_column(conn, table: str, column: str, sql_type: str):
+    existing = {col["name"] for col in inspect(conn).get_columns(table)}
+    if column not in existing:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {sql_type}"))
+
+
+def _create_index(conn, name: str, definition: str):
+    """
+    CREATE INDEX CONCURRENTLY on Postgres (no write lock on big tables).
+    Needs an AUTOCOMMIT connection, so migrations using it set "autocommit": True.
+    """
+    concurrently = "CONCURRENTLY " if conn.dialect.name == "postgresql" else ""
+    conn.execute(text(f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON {definition}"))
+
+
+# ---------------- migrations ----------------
+# Each one must be safe on a fresh DB where version 1 already created everything.
+
+def _v1_base_tables(conn):
+    Base.metadata.create_all(bind=conn)
+
+
+def _v2_pets_photo_url(conn):
+    _add_column(conn, "pets", "photo_url", "VARCHAR(500)")
+
+
+def _v3_pets_status_index(conn):
+    _create_index(conn, "ix_pets_status_created_at_id", "pets (status, created_at DESC, id DESC)")
+
+
+def _v4_pets_coordinates(conn, batch_size: int = 1000):
+    _add_column(conn, "pets", "latitude", "FLOAT")
+    _add_column(conn, "pets", "longitude", "FLOAT")
+    _add_column(conn, "pets", "geocell", "BIGINT")
+    _create_index(conn, "ix_pets_geocell", "pets (geocell)")
+
+    # backfill from location_url, one committed batch at a time
+    last_id = 0
+    while True:
+        rows = conn.execute(text("""
+            SELECT id, location_url FROM pets
+            WHERE latitude IS NULL AND id > :last_id
+            ORDER BY id LIMIT :limit
+        """), {"last_id": last_id, "limit": batch_size}).fetchall()
+        if not rows:
+            break
+        params = []
+        for pet_id, location_url in rows:
+            fields = location_fields(location_url)
+            if fields["latitude"] is not None:
+                params.append({"id": pet_id, **fields})
+        if params:
+            conn.execute(text("""
+                UPDATE pets SET latitude = :latitude, longitude = :longitude, geocell = :geocell
+                WHERE id = :id
+            """), params)
+        last_id = rows[-1][0]
+
+
+def _v5_pets_search_vector(conn):
+    if conn.dialect.name != "postgresql":
+        return  # other DBs use the in-memory index in app/search.py
+    conn.execute(text(PETS_SEARCH_VECTOR_DDL[0]))
+    _create_index(conn, "ix_pets_search_vector", "pets USING GIN (search_vector)")
+
+
+def _v6_pets_change_indexes(conn):
+    # GET /pets/export?since= filters on created_at OR adopted_at
+    _create_index(conn, "ix_pets_created_at", "pets (created_at)")
+    _create_index(conn, "ix_pets_adopted_at", "pets (adopted_at)")
+
+
+def _v7_pets_event_triggers(conn):
+    if conn.dialect.name != "postgresql":
+        return  # other DBs dispatch events from the session's after_commit hook
+    for statement in PET_EVENTS_TRIGGER_DDL:
+        conn.execute(text(statement))
+
+
+MIGRATIONS = [
+    {"version": 1, "name": "base tables", "apply": _v1_base_tables, "autocommit": False},
+    {"version": 2, "name": "pets.photo_url", "apply": _v2_pets_photo_url, "autocommit": False},
+    {"version": 3, "name": "pets status/created_at index", "apply": _v3_pets_status_index, "autocommit": True},
+    {"version": 4, "name": "pets coordinates + geocell", "apply": _v4_pets_coordinates, "autocommit": True},
+    {"version": 5, "name": "pets full-text search", "apply": _v5_pets_search_vector, "autocommit": True},
+    {"version": 6, "name": "pets created_at / adopted_at indexes", "apply": _v6_pets_change_indexes, "autocommit": True},
+    {"version": 7, "name": "pets NOTIFY triggers for /pets/stream", "apply": _v7_pets_event_triggers, "autocommit": False},
+]
+
+LATEST_VERSION = MIGRATIONS[-1]["version"]
+
+
+# ---------------- runner ----------------
+
+def _ensure_version_table(conn):
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(200) NOT NULL,
+            applied_at TIMESTAMP NOT NULL
+        )
+    """))
+
+
+def current_version(conn) -> int:
+    return conn.execute(text(f"SELECT max(version) FROM {SCHEMA_VERSION_TABLE}")).scalar() or 0
+
+
+def upgrade(target: int = LATEST_VERSION) -> list:
+    """
+    Applies every migration above the current version (up to target).
+    A Postgres advisory lock stops two deploys from migrating at once.
+    Returns the versions that were applied.
+    """
+    applied = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        postgres = lock_conn.dialect.name == "postgresql"
+        if postgres:
+            lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            _ensure_version_table(lock_conn)
+            version = current_version(lock_conn)
+
+            for migration in MIGRATIONS:
+                if migration["version"] <= version or migration["version"] > target:
+                    continue
+                print(f"➡️  {migration['version']}: {migration['name']}")
+                record = text(
+                    f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, name, applied_at) "
+                    "VALUES (:version, :name, :applied_at)"
+                )
+                params = {
+                    "version": migration["version"],
+                    "name": migration["name"],
+                    "applied_at": datetime.utcnow(),
+                }
+                if migration["autocommit"]:
+                    migration["apply"](lock_conn)
+                    lock_conn.execute(record, params)
+                else:
+                    with engine.begin() as conn:
+                        migration["apply"](conn)
+                        conn.execute(record, params)
+                applied.append(migration["version"])
+        finally:
+            if postgres:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+    return applied
+
+
+def status():
+    with engine.connect() as conn:
+        _ensure_version_table(conn)
+        conn.commit()
+        version = current_version(conn)
+    for migration in MIGRATIONS:
+        mark = "✅" if migration["version"] <= version else "⏳"
+        print(f"{mark} {migration['version']}: {migration['name']}")
+    return version
+
+
+# ---------------- worker-side check ----------------
+
+_schema_ok = False
+_last_check = 0.0
+
+
+async def require_current_schema():
+    """
+    App-wide dependency. One tiny query per worker, then a no-op.
+    If the DB is behind, requests get 503 until `upgrade` has been run.
+    """
+    global _schema_ok, _last_check
+    if _schema_ok:
+        return
+
+    now = time.monotonic()
+    if now - _last_check >= SCHEMA_RECHECK_SECONDS:
+        _last_check = now
+        try:
+            async with async_engine.connect() as conn:
+                version = (
+                    await conn.scalar(text(f"SELECT max(version) FROM {SCHEMA_VERSION_TABLE}"))
+                ) or 0
+        except DBAPIError:
+            version = 0  # no version table yet
+        _schema_ok = version >= LATEST_VERSION
+
+    if not _schema_ok:
+        raise HTTPException(
+            status_code=503,
+            detail="Database schema is out of date, run: python -m app.migrations upgrade",
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PawTrack database migrations")
+    parser.add_argument("command", nargs="?", default="upgrade", choices=["upgrade", "status"])
+    parser.add_argument("--target", type=int, default=LATEST_VERSION)
+    args = parser.parse_args()
+
+    if args.command == "status":
+        status()
+    else:
+        done = upgrade(args.target)
+        print(f"✅ Applied {len(done)} migration(s), schema is at version {args.target}")
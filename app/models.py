@@ -1,5 +1,5 @@
 # app/models.py
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, BigInteger, Float, String, DateTime, Index, DDL, event
 from datetime import datetime
 from .db import Base
 
@@ -20,9 +20,38 @@ class Pet(Base):
     location_url = Column(String(500), nullable=False)
     location_text = Column(String(150), nullable=True)
 
+    # Parsed from location_url when the pet is created (NULL if the link has no coordinates)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geocell = Column(BigInteger, nullable=True, index=True)  # see app/geo.py
+
     status = Column(String(10), default="AVAILABLE")  # AVAILABLE / ADOPTED
-    created_at = Column(DateTime, default=datetime.utcnow)
-    adopted_at = Column(DateTime, nullable=True)  # ✅ moved INSIDE Pet
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    adopted_at = Column(DateTime, nullable=True, index=True)  # ✅ moved INSIDE Pet
+
+    # ✅ matches the GET /pets query exactly: filter by status, newest first.
+    # Lets keyset pagination jump straight to the cursor position.
+    __table_args__ = (
+        Index("ix_pets_status_created_at_id", status, created_at.desc(), id.desc()),
+    )
+
+
+# ✅ Postgres full-text search: generated tsvector + GIN index (used by GET /pets/search).
+# Not mapped on the model so SQLite etc. still work; they use app/search.py instead.
+PETS_SEARCH_VECTOR_DDL = [
+    """
+    ALTER TABLE pets ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(location_text, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_pets_search_vector ON pets USING GIN (search_vector)",
+]
+
+for statement in PETS_SEARCH_VECTOR_DDL:
+    event.listen(Pet.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
 
 
 class User(Base):
@@ -0,0 +1,27 @@
+# app/pagination.py
+import base64
+from datetime import datetime
+from typing import Tuple
+
+from fastapi import HTTPException
+
+
+def encode_cursor(created_at: datetime, pet_id: int) -> str:
+    """
+    Turns the (created_at, id) of the last row on a page into an opaque string.
+    Clients just send it back as ?cursor=... to get the next page.
+    """
+    raw = f"{created_at.isoformat()}|{pet_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Reverse of encode_cursor. Raises 400 if the cursor was tampered with.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pet_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(pet_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
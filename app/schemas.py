@@ -1,6 +1,6 @@
 # app/schemas.py
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class PetCreate(BaseModel):
@@ -21,6 +21,8 @@ class PetOut(BaseModel):
     photo_url: Optional[str]  # Optional photo
     location_url: str
     location_text: Optional[str]
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     status: str
     created_at: datetime
 
@@ -29,6 +31,29 @@ class PetOut(BaseModel):
         from_attributes = True
 
 
+class PetNearbyOut(PetOut):
+    distance_km: float
+
+
+class PetPage(BaseModel):
+    items: List[PetOut]
+    # Pass this back as ?cursor=... to get the next page (None = last page)
+    next_cursor: Optional[str] = None
+
+
+class BulkImportError(BaseModel):
+    line: int
+    errors: List[str]
+
+
+class BulkImportReport(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[BulkImportError]
+    # True when there were more bad lines than we list in `errors`
+    errors_truncated: bool = False
+
+
 class UserRegister(BaseModel):
     full_name: str = Field(..., min_length=3, max_length=150)
     email: EmailStr
@@ -0,0 +1,177 @@
+# app/search.py
+import asyncio
+import re
+from bisect import bisect_left, insort
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Pet
+from .serialization import PET_OUT_COLUMNS
+
+# Field weights, highest first (same order as setweight A/B/C on Postgres)
+WEIGHTS = {"title": 3.0, "location_text": 2.0, "description": 1.0}
+
+# Postgres: generated column + GIN index, created by app/models.py (fresh DBs) /
+# migration 5 in app/migrations.py (existing ones)
+SEARCH_VECTOR = literal_column("pets.search_vector")
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def postgres_search_query(terms: List[str], status: Optional[str], species: Optional[str], limit: int):
+    """
+    "ginger cat" -> to_tsquery('ginger:* & cat:*'), ranked with ts_rank_cd.
+    Terms come from tokenize(), so they can't carry tsquery operators.
+    """
+    tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+    query = (
+        select(*PET_OUT_COLUMNS)
+        .where(SEARCH_VECTOR.op("@@")(tsquery))
+        .order_by(func.ts_rank_cd(SEARCH_VECTOR, tsquery).desc(), Pet.id.desc())
+        .limit(limit)
+    )
+    if status:
+        query = query.where(Pet.status == status)
+    if species:
+        query = query.where(Pet.species == species)
+    return query
+
+
+class InvertedIndex:
+    """
+    In-process full-text index used when the DB isn't Postgres.
+    term -> {pet_id: weight}, plus a sorted term list for prefix lookups.
+    Loaded once on first search, then kept current by create_pet / save_pet.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._terms: List[str] = []
+        self._docs: Dict[int, Tuple[str, str]] = {}  # pet_id -> (status, species)
+        self._loaded = False
+        self._loading = False
+        self._stale = False  # invalidate() was called during the load
+        # add / update_status calls made while the table is being streamed
+        self._pending: List[Tuple[Callable, tuple, dict]] = []
+        self._lock = asyncio.Lock()
+
+    def add(self, pet_id: int, status: str, species: str, **fields: Optional[str]):
+        if self._loading:
+            self._pending.append((self._add, (pet_id, status, species), fields))
+        elif self._loaded:
+            self._add(pet_id, status, species, **fields)
+        # not loaded yet: first search will read it from the DB
+
+    def _add(self, pet_id: int, status: str, species: str, **fields: Optional[str]):
+        self._docs[pet_id] = (status, species)
+        for field, weight in WEIGHTS.items():
+            for term in tokenize(fields.get(field)):
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    insort(self._terms, term)
+                postings[pet_id] = max(postings.get(pet_id, 0.0), weight)
+
+    def update_status(self, pet_id: int, status: str):
+        if self._loading:
+            self._pending.append((self._update_status, (pet_id, status), {}))
+        else:
+            self._update_status(pet_id, status)
+
+    def _update_status(self, pet_id: int, status: str):
+        if pet_id in self._docs:
+            self._docs[pet_id] = (status, self._docs[pet_id][1])
+
+    def _clear(self):
+        self._postings, self._terms, self._docs = {}, [], {}
+        self._loaded = False
+
+    def invalidate(self):
+        if self._loading:
+            self._stale = True  # let the running load finish, reload on the next search
+        else:
+            self._clear()
+
+    async def ensure_loaded(self, db: AsyncSession):
+        """
+        Streams the table into the index once. Only marked loaded after the
+        whole stream was read, so a failed or cancelled load is retried.
+        """
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            self._clear()
+            self._loading, self._stale = True, False
+            try:
+                result = await db.stream(
+                    select(Pet.id, Pet.status, Pet.species, Pet.title, Pet.description, Pet.location_text)
+                    .execution_options(yield_per=1000)
+                )
+                async for pet_id, status, species, title, description, location_text in result:
+                    self._add(
+                        pet_id, status, species,
+                        title=title, description=description, location_text=location_text,
+                    )
+            except BaseException:
+                self._clear()
+                raise
+            finally:
+                self._loading = False
+                pending, self._pending = self._pending, []
+            # writes that committed while we were reading (may repeat rows, _add is idempotent)
+            for method, args, kwargs in pending:
+                method(*args, **kwargs)
+            self._loaded = not self._stale
+
+    def _matches(self, term: str) -> Dict[int, float]:
+        """
+        Every pet with a word starting with `term`.
+        Exact word = full weight, prefix-only = half.
+        """
+        scores: Dict[int, float] = {}
+        i = bisect_left(self._terms, term)
+        while i < len(self._terms) and self._terms[i].startswith(term):
+            word = self._terms[i]
+            factor = 1.0 if word == term else 0.5
+            for pet_id, weight in self._postings[word].items():
+                scores[pet_id] = max(scores.get(pet_id, 0.0), weight * factor)
+            i += 1
+        return scores
+
+    def search(
+        self, terms: List[str], status: Optional[str], species: Optional[str], limit: int
+    ) -> List[int]:
+        """
+        Pet ids matching ALL terms, best score first.
+        """
+        total: Optional[Dict[int, float]] = None
+        for term in terms:
+            scores = self._matches(term)
+            if total is None:
+                total = scores
+            else:
+                total = {pet_id: total[pet_id] + s for pet_id, s in scores.items() if pet_id in total}
+            if not total:
+                return []
+
+        ranked = sorted(total.items(), key=lambda item: (-item[1], -item[0]))
+        ids = []
+        for pet_id, _ in ranked:
+            pet_status, pet_species = self._docs[pet_id]
+            if (status and pet_status != status) or (species and pet_species != species):
+                continue
+            ids.append(pet_id)
+            if len(ids) == limit:
+                break
+        return ids
+
+
+search_index = InvertedIndex()
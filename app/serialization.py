@@ -0,0 +1,56 @@
+# app/serialization.py
+"""
+Fast path for list responses.
+
+Rows we read ourselves are already valid, so instead of
+ORM object -> PetOut(from_attributes) -> jsonable_encoder -> json.dumps
+we select only the PetOut columns as plain tuples, zip them into dicts
+and encode once with orjson.
+"""
+import json
+from datetime import date, datetime
+from typing import Iterable, List
+
+from fastapi.responses import Response
+
+from .models import Pet
+from .schemas import PetOut
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+# Same fields, same order as the PetOut schema
+PET_OUT_FIELDS = list(PetOut.model_fields)
+PET_OUT_COLUMNS = [getattr(Pet, name) for name in PET_OUT_FIELDS]
+
+
+def pet_dicts(rows: Iterable[tuple]) -> List[dict]:
+    """
+    Rows from select(*PET_OUT_COLUMNS) -> PetOut-shaped dicts (no validation).
+    """
+    return [dict(zip(PET_OUT_FIELDS, row)) for row in rows]
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """
+    JSONResponse that skips FastAPI's response_model re-validation
+    (returning a Response bypasses it) and encodes with orjson when installed.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
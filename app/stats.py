@@ -0,0 +1,70 @@
+# app/stats.py
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Pet
+
+# How long (seconds) counts may be served before re-reading them from the DB.
+# Writes made by this worker are applied right away; the TTL only bounds how
+# stale other workers' writes can look.
+PET_COUNTS_TTL = float(os.getenv("PET_COUNTS_TTL", "30"))
+
+
+class PetCounters:
+    """
+    In-process pet counts per (status, species).
+    One GROUP BY query per TTL instead of a COUNT(*) per /chat message.
+    """
+
+    def __init__(self, ttl: float = PET_COUNTS_TTL):
+        self.ttl = ttl
+        self._counts: Counter = Counter()
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def _expired(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    async def _refresh(self, db: AsyncSession):
+        rows = await db.execute(
+            select(Pet.status, Pet.species, func.count()).group_by(Pet.status, Pet.species)
+        )
+        self._counts = Counter({(status, species): n for status, species, n in rows})
+        self._loaded_at = time.monotonic()
+
+    async def count(
+        self, db: AsyncSession, status: Optional[str] = None, species: Optional[str] = None
+    ) -> int:
+        if self._expired():
+            # only one request reloads, the rest wait for it
+            async with self._lock:
+                if self._expired():
+                    await self._refresh(db)
+        return sum(
+            n
+            for (pet_status, pet_species), n in self._counts.items()
+            if (status is None or pet_status == status)
+            and (species is None or pet_species == species)
+        )
+
+    def add(self, status: str, species: str, delta: int = 1):
+        # nothing loaded yet -> the first count() will read the real numbers anyway
+        if self._loaded_at is not None:
+            self._counts[(status, species)] += delta
+
+    def move(self, species: str, from_status: str, to_status: str):
+        if from_status != to_status:
+            self.add(from_status, species, -1)
+            self.add(to_status, species, +1)
+
+    def invalidate(self):
+        self._loaded_at = None
+
+
+pet_counters = PetCounters()
@@ -0,0 +1,39 @@
+# benchmarks/common.py
+"""
+Shared setup for the benchmark scripts.
+Must be imported BEFORE anything from app/, because app/db.py reads
+DATABASE_URL at import time.
+"""
+import os
+import subprocess
+
+# Benchmarks never touch the real database unless asked to.
+# Default file lives next to these scripts (git-ignored), whatever the cwd.
+BENCH_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pawtrack_bench.db")
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", f"sqlite:///{BENCH_DB_PATH}")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+# Low bcrypt cost for seeding; pass BCRYPT_ROUNDS=12 to benchmark real login cost
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+BENCH_PASSWORD = "password123"
+
+
+def bench_email(i: int) -> str:
+    # not *.local / *.test: EmailStr rejects special-use domains
+    return f"user{i}@bench.pawtrack.dev"
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
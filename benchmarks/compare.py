@@ -0,0 +1,36 @@
+# benchmarks/compare.py
+"""
+Compares two benchmarks.run JSON files (e.g. before / after a change).
+
+    python -m benchmarks.compare results/old.json results/new.json
+"""
+import json
+import sys
+
+
+def _change(old: float, new: float) -> str:
+    if not old:
+        return "   n/a"
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+
+def compare(old: dict, new: dict):
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']}")
+    print(f"{'scenario':<12} {'rps':>18} {'p50 ms':>20} {'p95 ms':>20} {'p99 ms':>20}")
+    for name, after in new["scenarios"].items():
+        before = old["scenarios"].get(name)
+        if not before:
+            continue
+        cells = [f"{after['throughput_rps']:>9} {_change(before['throughput_rps'], after['throughput_rps'])}"]
+        for pct in ("p50", "p95", "p99"):
+            b, a = before["latency_ms"][pct], after["latency_ms"][pct]
+            cells.append(f"{a:>11} {_change(b, a)}")
+        print(f"{name:<12} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+    with open(sys.argv[1]) as f_old, open(sys.argv[2]) as f_new:
+        compare(json.load(f_old), json.load(f_new))
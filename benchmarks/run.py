@@ -0,0 +1,408 @@
+# benchmarks/run.py
+"""
+Drives the API at a fixed concurrency and prints results as JSON.
+
+    python -m benchmarks.run                                  # all scenarios, in-process (ASGI)
+    python -m benchmarks.run --scenario login --concurrency 64
+    python -m benchmarks.run --url http://127.0.0.1:8000      # over HTTP against uvicorn
+    python -m benchmarks.run --out results/abc123.json        # keep it for benchmarks.compare
+
+Scenarios:
+- listing  : read-heavy mix (pages + cursors, detail, nearby, search, chat)
+- login    : login storm against random seeded users (bcrypt bound)
+- adoption : many users adopting the same few pets (exactly one may win each)
+- chat     : /chat live-count and FAQ questions
+- create   : POST /pets and POST /auth/register
+- bulk     : POST /pets/bulk with --bulk-rows NDJSON rows per request
+- export   : GET /pets/export, mostly incremental (?since=) plus some full CSV runs
+- stream   : POST /pets until its pet_created event reaches an open GET /pets/stream
+             (--url only: the in-process transport buffers whole responses, so it
+             can't hold an SSE connection open; "all" skips it in-process)
+Rows written by create / bulk / stream are deleted again afterwards, so every
+scenario sees the seeded dataset. Run benchmarks.seed first.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import itertools
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from . import common  # noqa: F401  (sets DATABASE_URL first)
+from .common import BENCH_PASSWORD, bench_email, git_commit, percentile
+
+import httpx
+from sqlalchemy import text
+
+from app.db import engine
+from app.events import NOTIFY_CHANNEL
+
+from .seed import pet_rows
+
+CHAT_MESSAGES = [
+    "how many pets available?", "how many dogs are available", "how many adopted",
+    "how do I adopt?", "how to register", "where is the map", "hello",
+]
+SEARCH_QUERIES = ["ginger cat", "black dog colombo", "kit", "friendly puppy", "galle", "tabby tom kandy"]
+
+
+def _db_scalar(sql: str, **params):
+    with engine.connect() as conn:
+        return conn.execute(text(sql), params).scalar() or 0
+
+
+async def _reset_rows(args, *statements):
+    """
+    Undoes a scenario's writes with raw SQL, then drops what the app keeps in
+    memory about those rows (counts, response cache, search index) so the
+    next scenario doesn't measure stale state.
+    """
+    with engine.begin() as conn:
+        for sql, params in statements:
+            conn.execute(text(sql), params)
+        if conn.dialect.name == "postgresql":
+            # every worker (of a --url server too) bumps its response cache on this
+            conn.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": NOTIFY_CHANNEL, "payload": json.dumps({"type": "reset", "data": {}})},
+            )
+    if args.url:
+        if engine.dialect.name != "postgresql":
+            print("⚠️  --url on SQLite: the server's in-memory counts / cache / search "
+                  "index don't see this reset", file=sys.stderr)
+        return
+
+    from app.cache import response_cache
+    from app.search import search_index
+    from app.stats import pet_counters
+
+    pet_counters.invalidate()
+    search_index.invalidate()
+    await response_cache.bump("AVAILABLE", "ADOPTED")
+
+
+def _new_pet(rng) -> dict:
+    row = next(pet_rows(rng, 1, 0.0))
+    return {name: row[name] for name in ("title", "species", "description", "location_url", "location_text")}
+
+
+def _newest_created_at() -> datetime:
+    newest = _db_scalar("SELECT max(created_at) FROM pets")
+    if isinstance(newest, str):  # SQLite hands back text
+        newest = datetime.fromisoformat(newest)
+    return newest or datetime.utcnow()
+
+
+async def _login(client, user_index: int) -> str:
+    response = await client.post(
+        "/auth/login", json={"email": bench_email(user_index), "password": BENCH_PASSWORD}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+# ---------------- scenarios ----------------
+# setup(client, args) -> state ; step(client, state, rng) -> (route, response)
+# optional: async reset(state) runs between warmup and the measured run and
+# again at the end; async close(state) after that. http_only = needs --url.
+
+class Listing:
+    async def setup(self, client, args):
+        return {"max_id": _db_scalar("SELECT max(id) FROM pets"), "cursors": []}
+
+    async def step(self, client, state, rng):
+        roll = rng.random()
+        if roll < 0.35:
+            status = rng.choice(("AVAILABLE", "AVAILABLE", "ADOPTED"))
+            return "/pets", await client.get("/pets", params={"status": status})
+        if roll < 0.55:
+            # follow a cursor from an earlier page (deep pages must stay cheap)
+            cursor = rng.choice(state["cursors"]) if state["cursors"] else None
+            params = {"cursor": cursor} if cursor else {}
+            response = await client.get("/pets", params=params)
+            if response.status_code == 200:
+                next_cursor = response.json().get("next_cursor")
+                if next_cursor and len(state["cursors"]) < 1000:
+                    state["cursors"].append(next_cursor)
+            return "/pets?cursor", response
+        if roll < 0.75:
+            pet_id = rng.randint(1, max(state["max_id"], 1))
+            return "/pets/{pet_id}", await client.get(f"/pets/{pet_id}")
+        if roll < 0.85:
+            params = {"lat": rng.uniform(5.9, 9.8), "lng": rng.uniform(79.6, 81.9), "radius_km": 5}
+            return "/pets/nearby", await client.get("/pets/nearby", params=params)
+        if roll < 0.95:
+            return "/pets/search", await client.get("/pets/search", params={"q": rng.choice(SEARCH_QUERIES)})
+        return "/chat", await client.post("/chat", json={"message": rng.choice(CHAT_MESSAGES)})
+
+
+class Login:
+    async def setup(self, client, args):
+        return {"users": _db_scalar("SELECT count(*) FROM users")}
+
+    async def step(self, client, state, rng):
+        i = rng.randrange(max(state["users"], 1))
+        return "/auth/login", await client.post(
+            "/auth/login", json={"email": bench_email(i), "password": BENCH_PASSWORD}
+        )
+
+
+class Adoption:
+    async def setup(self, client, args):
+        max_id = _db_scalar("SELECT max(id) FROM pets")
+        hot = list(range(1, min(args.hot_pets, max_id) + 1))
+        users = _db_scalar("SELECT count(*) FROM users")
+        tokens = [await _login(client, i % max(users, 1)) for i in range(min(args.concurrency, 50))]
+        state = {"hot": hot, "tokens": tokens, "args": args}
+        await self.reset(state)
+        return state
+
+    async def reset(self, state):
+        # put the hot pets back up for adoption so every run starts the same
+        await _reset_rows(state["args"], (
+            "UPDATE pets SET status = 'AVAILABLE', adopted_at = NULL WHERE id <= :n",
+            {"n": len(state["hot"])},
+        ))
+
+    async def step(self, client, state, rng):
+        pet_id = rng.choice(state["hot"])
+        headers = {"Authorization": "Bearer " + rng.choice(state["tokens"])}
+        return "/pets/{pet_id}/save", await client.post(f"/pets/{pet_id}/save", headers=headers)
+
+
+class Chat:
+    async def setup(self, client, args):
+        return {}
+
+    async def step(self, client, state, rng):
+        return "/chat", await client.post("/chat", json={"message": rng.choice(CHAT_MESSAGES)})
+
+
+class Create:
+    async def setup(self, client, args):
+        return {
+            "args": args,
+            "max_pet": _db_scalar("SELECT max(id) FROM pets"),
+            "max_user": _db_scalar("SELECT max(id) FROM users"),
+            # unique emails even if an earlier run was interrupted before its reset
+            "run": int(time.time()),
+            "next": itertools.count(),
+        }
+
+    async def reset(self, state):
+        await _reset_rows(
+            state["args"],
+            ("DELETE FROM pets WHERE id > :n", {"n": state["max_pet"]}),
+            ("DELETE FROM users WHERE id > :n", {"n": state["max_user"]}),
+        )
+
+    async def step(self, client, state, rng):
+        if rng.random() < 0.8:
+            return "/pets", await client.post("/pets", json=_new_pet(rng))
+        n = next(state["next"])
+        return "/auth/register", await client.post("/auth/register", json={
+            "full_name": f"New User {n}",
+            "email": f"new{n}.{state['run']}@bench.pawtrack.dev",
+            "phone_number": "0770000000",
+            "password": BENCH_PASSWORD,
+            "confirm_password": BENCH_PASSWORD,
+        })
+
+
+class Bulk(Create):
+    async def step(self, client, state, rng):
+        body = "".join(json.dumps(_new_pet(rng)) + "\n" for _ in range(state["args"].bulk_rows))
+        return "/pets/bulk", await client.post(
+            "/pets/bulk", content=body.encode(), headers={"Content-Type": "application/x-ndjson"}
+        )
+
+
+class Export:
+    async def setup(self, client, args):
+        return {"newest": _newest_created_at()}
+
+    async def step(self, client, state, rng):
+        if rng.random() < 0.8:
+            since = state["newest"] - timedelta(days=rng.randint(1, 7))
+            params = {"since": since.isoformat()}
+            return "/pets/export?since", await client.get("/pets/export", params=params)
+        params = {"format": "csv", "status": "ADOPTED"}
+        return "/pets/export", await client.get("/pets/export", params=params)
+
+
+class Stream(Create):
+    http_only = True
+
+    async def setup(self, client, args):
+        state = await super().setup(client, args)
+        state["waiting"] = {}  # pet title -> future resolved when its event arrives
+        ready = asyncio.get_running_loop().create_future()
+        state["listener"] = asyncio.create_task(self._listen(args.url, state["waiting"], ready))
+        await ready
+        return state
+
+    @staticmethod
+    async def _listen(url: str, waiting: dict, ready):
+        async with httpx.AsyncClient(base_url=url, timeout=None) as sse:
+            async with sse.stream("GET", "/pets/stream") as response:
+                ready.set_result(None)
+                async for line in response.aiter_lines():
+                    if line.startswith("data:"):
+                        future = waiting.pop(json.loads(line[5:]).get("title"), None)
+                        if future and not future.done():
+                            future.set_result(None)
+
+    async def step(self, client, state, rng):
+        pet = _new_pet(rng)
+        pet["title"] = f"Stream probe {next(state['next'])}.{state['run']}"
+        delivered = state["waiting"][pet["title"]] = asyncio.get_running_loop().create_future()
+        response = await client.post("/pets", json=pet)
+        if response.status_code == 200:
+            try:
+                await asyncio.wait_for(delivered, 10)
+            except asyncio.TimeoutError:
+                raise httpx.ReadTimeout("pet_created event not delivered")
+        return "/pets/stream", response
+
+    async def close(self, state):
+        state["listener"].cancel()
+
+
+SCENARIOS = {
+    "listing": Listing(), "login": Login(), "adoption": Adoption(), "chat": Chat(),
+    "create": Create(), "bulk": Bulk(), "export": Export(), "stream": Stream(),
+}
+
+
+# ---------------- driver ----------------
+
+def _summary(latencies, wall_seconds, statuses) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / wall_seconds, 1) if wall_seconds else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "p99": round(percentile(latencies, 99), 3),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        },
+        "status": dict(sorted(statuses.items())),
+    }
+
+
+async def run_scenario(client, name: str, args) -> dict:
+    scenario = SCENARIOS[name]
+    state = await scenario.setup(client, args)
+
+    async def drive(total: int, record: bool, seed_offset: int):
+        remaining = total
+        latencies, statuses = [], Counter()
+        by_route = defaultdict(lambda: ([], Counter()))
+
+        async def worker(worker_id: int):
+            nonlocal remaining
+            rng = random.Random(args.seed + seed_offset + worker_id)
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                try:
+                    route, response = await scenario.step(client, state, rng)
+                    status = str(response.status_code)
+                except httpx.HTTPError as e:
+                    route, status = "error", e.__class__.__name__
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                if record:
+                    latencies.append(elapsed_ms)
+                    statuses[status] += 1
+                    by_route[route][0].append(elapsed_ms)
+                    by_route[route][1][status] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+        return latencies, statuses, by_route, time.perf_counter() - start
+
+    await drive(args.warmup, record=False, seed_offset=10_000)
+    if hasattr(scenario, "reset"):
+        await scenario.reset(state)
+    latencies, statuses, by_route, wall = await drive(args.requests, record=True, seed_offset=0)
+    if hasattr(scenario, "reset"):
+        await scenario.reset(state)  # leave the seeded dataset for the next scenario
+    if hasattr(scenario, "close"):
+        await scenario.close(state)
+
+    result = _summary(latencies, wall, statuses)
+    if len(by_route) > 1:
+        result["routes"] = {
+            route: _summary(route_latencies, wall, route_statuses)
+            for route, (route_latencies, route_statuses) in sorted(by_route.items())
+        }
+    return result
+
+
+def _client(args) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.url:
+        return httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60)
+    from app.main import app
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench", limits=limits, timeout=60
+    )
+
+
+async def main(args) -> dict:
+    if args.scenario == "all":
+        names = [name for name, scenario in SCENARIOS.items()
+                 if args.url or not getattr(scenario, "http_only", False)]
+    else:
+        names = [args.scenario]
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "mode": "http" if args.url else "in-process",
+            "url": args.url,
+            "database": engine.dialect.name,
+            "concurrency": args.concurrency,
+            "requests_per_scenario": args.requests,
+            "seed": args.seed,
+            "dataset": {
+                "pets": _db_scalar("SELECT count(*) FROM pets"),
+                "users": _db_scalar("SELECT count(*) FROM users"),
+            },
+            "python": platform.python_version(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "scenarios": {},
+    }
+    async with _client(args) as client:
+        for name in names:
+            print(f"➡️  {name}", file=sys.stderr)
+            results["scenarios"][name] = await run_scenario(client, name, args)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PawTrack load test / benchmark")
+    parser.add_argument("--scenario", default="all", choices=["all", *SCENARIOS])
+    parser.add_argument("--url", default=None, help="benchmark a running server instead of in-process")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--hot-pets", type=int, default=10, help="pets fought over in 'adoption'")
+    parser.add_argument("--bulk-rows", type=int, default=500, help="rows per upload in 'bulk'")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="also write the JSON here")
+    args = parser.parse_args()
+    if not args.url and getattr(SCENARIOS.get(args.scenario), "http_only", False):
+        parser.error(f"--scenario {args.scenario} needs --url (a running server)")
+
+    output = json.dumps(asyncio.run(main(args)), indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
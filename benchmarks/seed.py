@@ -0,0 +1,122 @@
+# benchmarks/seed.py
+"""
+Seeds a benchmark dataset (deterministic for a given --seed).
+
+    python -m benchmarks.seed --pets 1000000 --users 100000
+    BENCH_DATABASE_URL=postgresql://... python -m benchmarks.seed
+
+All users share the password in benchmarks/common.py.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from . import common  # noqa: F401  (sets DATABASE_URL first)
+from .common import BENCH_PASSWORD, bench_email
+
+from sqlalchemy import insert, text
+
+from app.auth_utils import hash_password
+from app.db import engine
+from app.geo import encode_geocell
+from app.migrations import upgrade
+from app.models import Pet, User
+
+COLORS = ["ginger", "black", "white", "brown", "grey", "spotted", "tabby", "golden"]
+KINDS = {"DOG": ["dog", "puppy", "pup"], "CAT": ["cat", "kitten", "tom"]}
+PLACES = ["Colombo", "Kandy", "Galle", "Negombo", "Jaffna", "Matara", "Kurunegala", "Nuwara Eliya"]
+WORDS = ["friendly", "shy", "hungry", "injured", "playful", "calm", "near", "market", "temple", "beach"]
+
+BATCH_SIZE = 5000
+
+
+def pet_rows(rng: random.Random, count: int, adopted_ratio: float):
+    now = datetime.utcnow()
+    for _ in range(count):
+        species = rng.choice(("DOG", "CAT"))
+        color = rng.choice(COLORS)
+        place = rng.choice(PLACES)
+        # somewhere in Sri Lanka
+        lat = round(rng.uniform(5.9, 9.8), 6)
+        lng = round(rng.uniform(79.6, 81.9), 6)
+        created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+        adopted = rng.random() < adopted_ratio
+        yield {
+            "title": f"{color.title()} {rng.choice(KINDS[species])} in {place}",
+            "species": species,
+            "description": " ".join(rng.choice(WORDS) for _ in range(8)),
+            "photo_url": None,
+            "location_url": f"https://maps.google.com/?q={lat},{lng}",
+            "location_text": place,
+            "latitude": lat,
+            "longitude": lng,
+            "geocell": encode_geocell(lat, lng),
+            "status": "ADOPTED" if adopted else "AVAILABLE",
+            "created_at": created_at,
+            "adopted_at": created_at + timedelta(days=1) if adopted else None,
+        }
+
+
+def _insert_batched(table, rows):
+    batch = []
+    total = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            with engine.begin() as conn:
+                conn.execute(insert(table), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(insert(table), batch)
+        total += len(batch)
+    return total
+
+
+def seed(pets: int, users: int, adopted_ratio: float, seed_value: int, reset: bool):
+    upgrade()
+    if reset:
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM pets"))
+            conn.execute(text("DELETE FROM users"))
+
+    rng = random.Random(seed_value)
+    start = time.perf_counter()
+    pet_count = _insert_batched(Pet.__table__, pet_rows(rng, pets, adopted_ratio))
+
+    # one bcrypt hash for everybody, otherwise seeding 100k users takes hours
+    password_hash = hash_password(BENCH_PASSWORD)
+    user_rows = (
+        {
+            "full_name": f"Bench User {i}",
+            "email": bench_email(i),
+            "phone_number": "0770000000",
+            "password_hash": password_hash,
+            "created_at": datetime.utcnow(),
+        }
+        for i in range(users)
+    )
+    user_count = _insert_batched(User.__table__, user_rows)
+
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM ANALYZE pets"))
+            conn.execute(text("VACUUM ANALYZE users"))
+    else:
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+    print(f"✅ Seeded {pet_count} pets and {user_count} users in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the PawTrack benchmark database")
+    parser.add_argument("--pets", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--adopted-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-reset", action="store_true", help="append instead of wiping first")
+    args = parser.parse_args()
+    seed(args.pets, args.users, args.adopted_ratio, args.seed, not args.no_reset)
@@ -0,0 +1,74 @@
+# benchmarks/serialization.py
+"""
+Rows/sec for turning pets into a JSON list response, old path vs fast path.
+
+    python -m benchmarks.serialization --rows 100 --repeat 200
+
+- orm_pydantic : select(Pet) ORM objects -> PetOut(from_attributes) ->
+                 jsonable_encoder -> json.dumps   (what response_model did)
+- fast_path    : select(*PET_OUT_COLUMNS) tuples -> dicts -> orjson
+Both include the query, so hydration cost is counted too. Run benchmarks.seed first.
+"""
+import argparse
+import json
+import time
+
+from . import common  # noqa: F401  (sets DATABASE_URL first)
+from .common import git_commit
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db import engine
+from app.models import Pet
+from app.schemas import PetOut
+from app.serialization import PET_OUT_COLUMNS, FastJSONResponse, orjson, pet_dicts
+
+
+def orm_pydantic(session: Session, rows: int) -> bytes:
+    pets = session.scalars(select(Pet).order_by(Pet.id).limit(rows)).all()
+    validated = [PetOut.model_validate(pet) for pet in pets]
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def fast_path(session: Session, rows: int) -> bytes:
+    result = session.execute(select(*PET_OUT_COLUMNS).order_by(Pet.id).limit(rows))
+    return FastJSONResponse(pet_dicts(result)).body
+
+
+def measure(fn, rows: int, repeat: int) -> dict:
+    with Session(engine) as session:
+        fn(session, rows)  # warm up
+        start = time.perf_counter()
+        for _ in range(repeat):
+            body = fn(session, rows)
+            session.expunge_all()
+        elapsed = time.perf_counter() - start
+    return {
+        "rows_per_sec": round(rows * repeat / elapsed),
+        "ms_per_response": round(elapsed / repeat * 1000, 3),
+        "bytes": len(body),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List serialization benchmark")
+    parser.add_argument("--rows", type=int, default=100, help="rows per response")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    before = measure(orm_pydantic, args.rows, args.repeat)
+    after = measure(fast_path, args.rows, args.repeat)
+    print(json.dumps({
+        "meta": {
+            "commit": git_commit(),
+            "database": engine.dialect.name,
+            "rows": args.rows,
+            "repeat": args.repeat,
+            "encoder": "orjson" if orjson else "json",
+        },
+        "orm_pydantic": before,
+        "fast_path": after,
+        "speedup": round(after["rows_per_sec"] / before["rows_per_sec"], 2),
+    }, indent=2))
@@ -0,0 +1,5 @@
+# tests/conftest.py
+import os
+
+# app/db.py needs a URL at import; these tests never open a connection
+os.environ.setdefault("DATABASE_URL", "sqlite://")
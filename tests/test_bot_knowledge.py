@@ -0,0 +1,14 @@
+# tests/test_bot_knowledge.py
+from app.bot_knowledge import match_rule, match_species
+
+
+def test_location_is_not_a_cat():
+    assert match_species("how many pets are available near my location") is None
+    assert match_rule("is the location available?")["tags"] == ["map", "location", "google maps"]
+
+
+def test_species_and_stats_match_whole_words():
+    assert match_species("how many cats are available") == "CAT"
+    assert match_species("any dog near me?") == "DOG"
+    assert match_rule("how many dogs available")["status"] == "AVAILABLE"
+    assert match_rule("how many pets available")["status"] == "AVAILABLE"
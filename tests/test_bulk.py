@@ -0,0 +1,56 @@
+# tests/test_bulk.py
+import asyncio
+
+from app import bulk
+
+
+def _records(body: bytes, parser=bulk._iter_csv, chunk_size: int = 7):
+    async def chunks():
+        for i in range(0, len(body), chunk_size):
+            yield body[i:i + chunk_size]
+
+    async def collect():
+        return [item async for item in parser(chunks())]
+
+    return [
+        (line, str(record) if isinstance(record, Exception) else record)
+        for line, record in asyncio.run(collect())
+    ]
+
+
+def test_unterminated_quote_at_end_fails_alone():
+    body = b'title,species\nUnterminated,"DOG\nGood dog,DOG\nOther,CAT\n'
+    assert _records(body) == [
+        (2, "unterminated quoted field"),
+        (3, {"title": "Good dog", "species": "DOG"}),
+        (4, {"title": "Other", "species": "CAT"}),
+    ]
+
+
+def test_stray_quote_inside_unquoted_field_is_text():
+    body = b'title,species\nBig 5" dog,DOG\nRex,DOG\n"Multi\nline",CAT'
+    assert _records(body) == [
+        (2, {"title": 'Big 5" dog', "species": "DOG"}),
+        (3, {"title": "Rex", "species": "DOG"}),
+        (4, {"title": "Multi\nline", "species": "CAT"}),
+    ]
+
+
+def test_overlong_line_is_reported_and_skipped(monkeypatch):
+    monkeypatch.setattr(bulk, "BULK_MAX_LINE_LENGTH", 20)
+    body = b'{"title": "ok"}\n' + b"x" * 100 + b'\n{"title": "also ok"}\n' + b"y" * 50
+    assert _records(body, bulk._iter_ndjson) == [
+        (1, {"title": "ok"}),
+        (2, "line longer than 20 bytes"),
+        (3, {"title": "also ok"}),
+        (4, "line longer than 20 bytes"),
+    ]
+
+
+def test_invalid_utf8_fails_only_its_line():
+    body = '﻿{"title": "a"}\n{"title": "caf'.encode() + b"\xe9" + b'"}\n{"title": "b"}\n'
+    assert _records(body, bulk._iter_ndjson) == [
+        (1, {"title": "a"}),
+        (2, "invalid UTF-8 at byte 14"),
+        (3, {"title": "b"}),
+    ]